@@ -0,0 +1,44 @@
+"""Run the qimp benchmark suite and compare it with a baseline.
+
+Execute 'python benchmarks/run.py --help' for the options. The default run writes
+benchmarks/results.json and compares it with benchmarks/baseline.json, exiting with status 1
+on regressions. Refresh the baseline with '--output benchmarks/baseline.json --compare ""'.
+"""
+import argparse
+import sys
+from pathlib import Path
+
+BENCHMARKS_DIR = Path(__file__).parent
+sys.path.insert(0, str(BENCHMARKS_DIR.parent.joinpath("src")))
+
+from qimp.Instrumentation import Benchmarks  # noqa: E402
+
+
+def main() -> int:
+    """Run the benchmarks from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=Benchmarks.SIZES)
+    parser.add_argument("--cases", nargs="+", choices=list(Benchmarks.CASES))
+    parser.add_argument("--max-side", type=int, default=0, help="override the size limits")
+    parser.add_argument("--output", default=str(BENCHMARKS_DIR.joinpath("results.json")))
+    parser.add_argument("--compare", default=str(BENCHMARKS_DIR.joinpath("baseline.json")))
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    args = parser.parse_args()
+
+    results = Benchmarks.run_benchmarks(args.sizes, args.cases, args.max_side)
+    Benchmarks.save(results, args.output)
+    for key, record in results["results"].items():
+        print(key, record)
+
+    if args.compare and Path(args.compare).exists():
+        regressions = Benchmarks.compare(
+            results, Benchmarks.load(args.compare), tolerance=args.tolerance
+        )
+        for regression in regressions:
+            print("REGRESSION", regression)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -42,6 +42,14 @@ def mypy(session: Session) -> None:
     session.run("inv", "mypy")
 
 
+@session(python="3.11")
+def benchmarks(session: Session) -> None:
+    """Run the benchmark suite against the stored baseline."""
+    session.install(".")
+    session.install("invoke")
+    session.run("inv", "bench", *session.posargs)
+
+
 @session(python="3.11")
 def security(session: Session) -> None:
     """Scan dependencies for insecure packages."""
@@ -0,0 +1,134 @@
+"""Encode and execute many images in a single backend job."""
+import typing
+
+import numpy as np
+from qiskit import QuantumCircuit
+
+from qimp.ImageEncoding.Encodings import NEQR
+from qimp.ImageEncoding.QuantumImage import QuantumImage
+from qimp.ImageEncoding.Templates import frqi_template
+from qimp.Instrumentation.Metrics import Metrics, stage
+
+from .Cache import cached_transpile
+
+# default construction method of every encoding
+METHODS = {"FRQI": "ucry", "NEQR": "mcx"}
+
+
+def build_batch(
+    images: typing.Sequence[np.ndarray],
+    encoding: str = "FRQI",
+    method: str = "",
+    backend: typing.Any = None,
+    zooming_factor: float = 1.0,
+    transform: typing.Optional[typing.Callable[[QuantumImage], None]] = None,
+) -> typing.List[QuantumImage]:
+    """Encode every image and transpile its circuit for the backend.
+
+    FRQI images share one parameterised template per size, which is transpiled once and
+    bound to the angles of every image. NEQR circuits, and the circuits changed by a
+    transform, depend on the pixels, so they are built one by one and transpiled together.
+
+    Args:
+        images (list): Images to encode, all of the same size once padded.
+        encoding (str): "FRQI" or "NEQR".
+        method (str): Construction method of the encoding, defaults to METHODS.
+        backend (typing.Any): Target backend, the circuits are not transpiled if None.
+        zooming_factor (float): Zooming factor applied to every image.
+        transform (typing.Callable): Applied to every encoded image, such as a filter.
+
+    Returns:
+        list: The encoded quantum images, their circuits ready to run.
+
+    Raises:
+        Exception: If the encoding is unknown or the images differ in size.
+    """
+    if encoding not in METHODS:
+        raise Exception("Unknown encoding " + str(encoding))
+    method = method or METHODS[encoding]
+    quantumimages = [QuantumImage(image, zooming_factor) for image in images]
+    if len({quantumimage.required_qubits for quantumimage in quantumimages}) > 1:
+        raise Exception("All the images of a batch must have the same size")
+
+    for quantumimage in quantumimages:
+        if encoding == "FRQI":
+            template = frqi_template(quantumimage.required_qubits, method)
+            template.bind(quantumimage, None if transform else backend)
+        else:
+            NEQR(quantumimage, method=method)
+        if transform is not None:
+            transform(quantumimage)
+    if encoding == "FRQI" and transform is None:
+        return quantumimages
+
+    if backend is not None:
+        circuits = cached_transpile(
+            [quantumimage.circuit for quantumimage in quantumimages], backend
+        )
+        for quantumimage, circuit in zip(quantumimages, circuits):
+            quantumimage.circuit = circuit
+    return quantumimages
+
+
+def run_batch(
+    images: typing.Sequence[np.ndarray],
+    encoding: str = "FRQI",
+    method: str = "",
+    shots: int = 0,
+    backend: typing.Any = None,
+    zooming_factor: float = 1.0,
+    metrics: typing.Optional[Metrics] = None,
+    transform: typing.Optional[typing.Callable[[QuantumImage], None]] = None,
+) -> np.ndarray:
+    """Encode, execute and retrieve many images with a single backend job.
+
+    Submitting all the circuits together lets Aer run the experiments in parallel and
+    removes the per-image job overhead, which dominates small images.
+
+    Args:
+        images (list): Images to encode, all of the same size once padded.
+        encoding (str): "FRQI" or "NEQR".
+        method (str): Construction method of the encoding, defaults to METHODS.
+        shots (int): Number of measurements per image, if zero the exact probabilities are
+            saved and a single shot is run.
+        backend (typing.Any): Aer backend, defaults to the statevector AerSimulator.
+        zooming_factor (float): Zooming factor applied to every image.
+        metrics (Metrics): Records the time and resources of every stage, if given.
+        transform (typing.Callable): Applied to every encoded image, such as a filter.
+
+    Returns:
+        np.ndarray: The retrieved images, stacked along the first axis.
+    """
+    if backend is None:
+        from qiskit_aer import AerSimulator
+
+        backend = AerSimulator(method="statevector")
+
+    with stage(metrics, "build"):
+        quantumimages = build_batch(images, encoding, method, backend, zooming_factor, transform)
+        for quantumimage in quantumimages:
+            if shots:
+                quantumimage.measure()
+            else:
+                quantumimage.save_probabilities()
+        circuits: typing.List[QuantumCircuit] = [
+            quantumimage.circuit for quantumimage in quantumimages
+        ]
+
+    with stage(metrics, "simulate"):
+        # zero lets Aer spread the experiments over all the available cores
+        result = backend.run(circuits, shots=shots or 1, max_parallel_experiments=0).result()
+
+    with stage(metrics, "retrieve"):
+        # bound templates share their name, so the experiments are read by index
+        retrieved = [
+            quantumimage.decode(
+                quantumimage.probabilities(
+                    result.get_counts(index)
+                    if shots
+                    else np.asarray(result.data(index)["probabilities"], dtype=float)
+                )
+            )
+            for index, quantumimage in enumerate(quantumimages)
+        ]
+    return np.stack(retrieved)
@@ -0,0 +1,295 @@
+"""Cache of transpiled circuits, in memory and on disk, keyed by the structure of the circuit."""
+import collections
+import hashlib
+import os
+import typing
+
+import numpy as np
+import qiskit
+from qiskit import QuantumCircuit, qpy
+from qiskit.circuit import ControlledGate, Instruction, ParameterExpression
+from qiskit.circuit.library import get_standard_gate_name_mapping
+
+STANDARD_GATES = set(get_standard_gate_name_mapping())
+
+
+def _parameter(value: typing.Any) -> str:
+    """Exact text of a gate parameter."""
+    if isinstance(value, np.ndarray):
+        return hashlib.sha256(np.ascontiguousarray(value).tobytes()).hexdigest()
+    if isinstance(value, ParameterExpression):
+        return str(value)
+    return repr(value)
+
+
+# fingerprints of the operations already seen, by id, with the operation itself so that its
+# id is not reused while the memo is alive
+Memo = typing.Dict[int, typing.Tuple[Instruction, str]]
+
+
+def _operation(operation: Instruction, memo: Memo) -> str:
+    """Fingerprint of an operation, its definition included for the non standard ones.
+
+    Args:
+        operation (Instruction): The operation.
+        memo (dict): Fingerprints of the operations already seen, by id, as the gates of
+            the filters are shared by many instructions. The operations are kept alive, as
+            qiskit may build a new one every time an instruction is read.
+
+    Returns:
+        str: The fingerprint.
+    """
+    if id(operation) in memo:
+        return memo[id(operation)][1]
+    parts = [operation.name, str(operation.num_qubits), str(operation.num_clbits)]
+    parts += [_parameter(value) for value in operation.params]
+    if isinstance(operation, ControlledGate):
+        parts += [
+            str(operation.num_ctrl_qubits),
+            str(operation.ctrl_state),
+            _operation(operation.base_gate, memo),
+        ]
+    elif operation.name not in STANDARD_GATES and operation.definition is not None:
+        parts.append(_circuit(operation.definition, memo))
+    digest = hashlib.sha256("|".join(parts).encode()).hexdigest()
+    memo[id(operation)] = (operation, digest)
+    return digest
+
+
+def _circuit(circuit: QuantumCircuit, memo: Memo) -> str:
+    """Fingerprint of a circuit, see fingerprint."""
+    digest = hashlib.sha256()
+    digest.update(
+        "{} {} {}\n".format(
+            circuit.num_qubits, circuit.num_clbits, _parameter(circuit.global_phase)
+        ).encode()
+    )
+    for instruction in circuit.data:
+        qubits = [circuit.find_bit(qubit).index for qubit in instruction.qubits]
+        clbits = [circuit.find_bit(clbit).index for clbit in instruction.clbits]
+        digest.update(
+            "{} {} {}\n".format(_operation(instruction.operation, memo), qubits, clbits).encode()
+        )
+    return digest.hexdigest()
+
+
+def fingerprint(circuit: QuantumCircuit) -> str:
+    """Hash of the structure of a circuit.
+
+    Two circuits have the same fingerprint when they apply the same operations, with the
+    same parameters, to the same qubits and bits, with the same global phase, whatever
+    their names. The definitions of the custom gates are part of the hash, their global
+    phase included, so gates sharing a name but not their circuit are told apart.
+
+    Args:
+        circuit (QuantumCircuit): The circuit.
+
+    Returns:
+        str: The hexadecimal hash.
+    """
+    return _circuit(circuit, {})
+
+
+def backend_key(backend: typing.Any) -> str:
+    """Name, simulation method and supported operations of a backend.
+
+    Args:
+        backend (typing.Any): The backend.
+
+    Returns:
+        str: The key of the backend.
+    """
+    method = getattr(getattr(backend, "options", None), "method", None)
+    operations = sorted(getattr(backend, "operation_names", []))
+    return "{} {} {}".format(backend.name, method, operations)
+
+
+class TranspileCache(object):
+    """Transpiled circuits, kept in a bounded LRU cache and, optionally, in a QPY store.
+
+    A circuit is transpiled once per fingerprint, backend and transpilation options. The
+    on-disk store is shared across processes and runs: when it grows beyond its size
+    bound, the least recently used files are deleted. The circuits returned are copies,
+    so the callers can add measurements to them.
+    """
+
+    __slots__ = ("maxsize", "directory", "max_bytes", "circuits", "hits", "misses")
+
+    def __init__(
+        self,
+        maxsize: int = 128,
+        directory: typing.Optional[str] = None,
+        max_bytes: int = pow(2, 30),
+    ) -> None:
+        """
+        Returns an empty cache.
+
+        Args:
+            maxsize (int): Number of circuits kept in memory.
+            directory (str): Directory of the on-disk store, disabled if None.
+            max_bytes (int): Size bound of the on-disk store.
+
+        Returns: None
+        """
+        self.maxsize = maxsize
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.circuits: typing.OrderedDict[str, QuantumCircuit] = collections.OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, circuit: QuantumCircuit, backend: typing.Any, **kwargs: typing.Any) -> str:
+        """Key of a circuit transpiled for a backend.
+
+        Args:
+            circuit (QuantumCircuit): The circuit.
+            backend (typing.Any): The backend.
+            kwargs (typing.Any): Options of qiskit.transpile, such as basis_gates and
+                optimization_level.
+
+        Returns:
+            str: The hexadecimal key.
+        """
+        options = sorted((name, _parameter(value)) for name, value in kwargs.items())
+        text = "{} {} {} qpy{} qiskit{}".format(
+            fingerprint(circuit),
+            backend_key(backend),
+            options,
+            qpy.QPY_VERSION,
+            qiskit.__version__,
+        )
+        return hashlib.sha256(text.encode()).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(typing.cast(str, self.directory), key + ".qpy")
+
+    def _load(self, key: str) -> typing.Optional[QuantumCircuit]:
+        """Circuit of the on-disk store, marked as the most recently used."""
+        if not self.directory or not os.path.exists(self._path(key)):
+            return None
+        path = self._path(key)
+        with open(path, "rb") as file:
+            circuit = typing.cast(QuantumCircuit, qpy.load(file)[0])
+        os.utime(path)
+        return circuit
+
+    def _store(self, key: str, circuit: QuantumCircuit) -> None:
+        """Write a circuit to the on-disk store and evict the least recently used ones."""
+        if not self.directory:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        # written aside and renamed, so other processes never read a partial file
+        partial = self._path(key) + "." + str(os.getpid())
+        with open(partial, "wb") as file:
+            qpy.dump(circuit, file)
+        os.replace(partial, self._path(key))
+
+        entries = [
+            os.path.join(self.directory, name)
+            for name in os.listdir(self.directory)
+            if name.endswith(".qpy")
+        ]
+        entries.sort(key=os.path.getmtime, reverse=True)
+        total = 0
+        for path in entries:
+            total += os.path.getsize(path)
+            if total > self.max_bytes and path != self._path(key):
+                os.remove(path)
+
+    def _remember(self, key: str, circuit: QuantumCircuit) -> None:
+        self.circuits[key] = circuit
+        self.circuits.move_to_end(key)
+        while len(self.circuits) > self.maxsize:
+            self.circuits.popitem(last=False)
+
+    def transpile(
+        self,
+        circuits: typing.Union[QuantumCircuit, typing.List[QuantumCircuit]],
+        backend: typing.Any,
+        **kwargs: typing.Any,
+    ) -> typing.Any:
+        """Transpile the circuits missing from the cache, in a single call.
+
+        Args:
+            circuits (QuantumCircuit): A circuit or a list of circuits.
+            backend (typing.Any): Target backend.
+            kwargs (typing.Any): Other options of qiskit.transpile.
+
+        Returns:
+            QuantumCircuit: The transpiled circuit, or the list of transpiled circuits.
+        """
+        single = isinstance(circuits, QuantumCircuit)
+        batch = [typing.cast(QuantumCircuit, circuits)] if single else list(circuits)
+        keys = [self.key(circuit, backend, **kwargs) for circuit in batch]
+        found: typing.Dict[str, QuantumCircuit] = {}
+        for key in keys:
+            if key in found:
+                continue
+            if key in self.circuits:
+                self.circuits.move_to_end(key)
+                found[key] = self.circuits[key]
+                continue
+            loaded = self._load(key)
+            if loaded is not None:
+                self._remember(key, loaded)
+                found[key] = loaded
+
+        missing = {key: circuit for key, circuit in zip(keys, batch) if key not in found}
+        self.hits += len(keys) - len(missing)
+        self.misses += len(missing)
+        if missing:
+            transpiled = qiskit.transpile(list(missing.values()), backend, **kwargs)
+            for key, circuit in zip(missing, transpiled):
+                self._remember(key, circuit)
+                self._store(key, circuit)
+                found[key] = circuit
+
+        result = []
+        for key, circuit in zip(keys, batch):
+            copy = found[key].copy()
+            # keep the name of the caller, results are looked up by circuit name
+            copy.name = circuit.name
+            result.append(copy)
+        return result[0] if single else result
+
+    def clear(self) -> None:
+        """Forget the circuits kept in memory and the statistics, the disk is untouched."""
+        self.circuits.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+# cache used by the execution layer, its store is enabled by QIMP_TRANSPILE_CACHE
+transpile_cache = TranspileCache(directory=os.environ.get("QIMP_TRANSPILE_CACHE") or None)
+
+
+def cached_transpile(
+    circuits: typing.Union[QuantumCircuit, typing.List[QuantumCircuit]],
+    backend: typing.Any,
+    **kwargs: typing.Any,
+) -> typing.Any:
+    """Transpile through the shared cache, see TranspileCache.transpile.
+
+    Args:
+        circuits (QuantumCircuit): A circuit or a list of circuits.
+        backend (typing.Any): Target backend.
+        kwargs (typing.Any): Other options of qiskit.transpile.
+
+    Returns:
+        QuantumCircuit: The transpiled circuit, or the list of transpiled circuits.
+    """
+    return transpile_cache.transpile(circuits, backend, **kwargs)
+
+
+def set_transpile_cache_dir(path: typing.Optional[str], max_bytes: int = pow(2, 30)) -> None:
+    """
+    Store the transpiled circuits on disk, as QPY files, to reuse them across processes.
+
+    Args:
+        path (str): Directory of the store, None disables it.
+        max_bytes (int): Size bound of the store.
+
+    Returns: None
+    """
+    transpile_cache.directory = path
+    transpile_cache.max_bytes = max_bytes
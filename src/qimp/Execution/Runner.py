@@ -0,0 +1,196 @@
+"""Run the circuit of a quantum image on the Aer simulation method that suits it."""
+import dataclasses
+import math
+import os
+import typing
+
+import numpy as np
+from qiskit import QuantumCircuit
+from qiskit.result import Result
+
+from qimp.ImageEncoding.QuantumImage import QuantumImage
+from qimp.Instrumentation.Metrics import stage
+
+from .Cache import cached_transpile
+
+# gates the stabilizer method simulates, the circuit is Clifford when it only has these
+CLIFFORD_GATES = {
+    "id",
+    "x",
+    "y",
+    "z",
+    "h",
+    "s",
+    "sdg",
+    "sx",
+    "sxdg",
+    "cx",
+    "cy",
+    "cz",
+    "swap",
+    "barrier",
+    "measure",
+    "reset",
+}
+
+# the extended stabilizer method samples Clifford circuits with a few T gates
+T_GATES = {"t", "tdg"}
+MAX_T_GATES = 16
+
+# above this many qubits, circuits whose gates only act on neighbouring qubits are run as
+# matrix product states, whose cost grows with the entanglement rather than the qubits
+MPS_QUBITS = 24
+MPS_SPAN = 2
+
+# bytes of a complex amplitude in double precision
+AMPLITUDE_BYTES = 16
+
+
+@dataclasses.dataclass(frozen=True)
+class ExecutionResult:
+    """Outcome of the execution of the circuit of a quantum image.
+
+    Attributes:
+        image (np.ndarray): The retrieved image.
+        probabilities (np.ndarray): Probability of every basis state of the encoding qubits,
+            exact or estimated from the counts.
+        method (str): The Aer simulation method.
+        shots (int): Number of measurements, zero for exact probabilities.
+        seed (int): Seed of the simulator, None if random.
+        counts (dict): Counts of the encoding qubits, None for exact probabilities.
+        result (Result): The result of the backend.
+    """
+
+    image: np.ndarray
+    probabilities: np.ndarray
+    method: str
+    shots: int
+    seed: typing.Optional[int]
+    counts: typing.Optional[typing.Dict[str, int]]
+    result: Result
+
+
+def memory_qubits() -> int:
+    """Largest statevector that fits in half of the physical memory.
+
+    Returns:
+        int: Its number of qubits.
+    """
+    try:
+        memory = os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+    except (AttributeError, ValueError, OSError):
+        # 16 GiB when the memory cannot be read
+        memory = pow(2, 34)
+    return int(math.log2(memory / 2 / AMPLITUDE_BYTES))
+
+
+def choose_method(circuit: QuantumCircuit, shots: int = 0, max_qubits: int = 0) -> str:
+    """Choose the Aer method simulating a circuit in the least time.
+
+    Clifford circuits run on the stabilizer method at any size. Circuits with resets leave
+    a mixed state: the exact probabilities need the density matrix, while with shots every
+    shot is a separate statevector trajectory, so the density matrix is chosen when it is
+    cheaper than the trajectories. Statevectors beyond the memory, and large circuits
+    acting on neighbouring qubits only, run as matrix product states, or on the extended
+    stabilizer method when they are sampled and have a few T gates.
+
+    Args:
+        circuit (QuantumCircuit): Circuit to run.
+        shots (int): Number of measurements, zero for exact probabilities.
+        max_qubits (int): Largest statevector to allocate, by default the one fitting in
+            half of the memory.
+
+    Returns:
+        str: "stabilizer", "extended_stabilizer", "statevector", "density_matrix" or
+            "matrix_product_state".
+
+    Raises:
+        Exception: If the exact probabilities of a circuit with resets do not fit in memory.
+    """
+    max_qubits = max_qubits or memory_qubits()
+    operations = circuit.count_ops()
+    qubits = circuit.num_qubits
+    if set(operations) <= CLIFFORD_GATES:
+        return "stabilizer"
+
+    if "reset" in operations:
+        fits = 2 * qubits <= max_qubits
+        if not shots:
+            if not fits:
+                raise Exception(
+                    "The exact probabilities of a circuit with resets need a density matrix of "
+                    + str(qubits)
+                    + " qubits, run it with shots or without resets"
+                )
+            return "density_matrix"
+        # a pass on the density matrix costs as much as 2^n statevector trajectories
+        if fits and pow(2, qubits) <= shots:
+            return "density_matrix"
+        return "statevector" if qubits <= max_qubits else "matrix_product_state"
+
+    span = max(
+        (
+            max(circuit.find_bit(qubit).index for qubit in instruction.qubits)
+            - min(circuit.find_bit(qubit).index for qubit in instruction.qubits)
+            for instruction in circuit.data
+            if instruction.operation.name != "barrier" and len(instruction.qubits) > 1
+        ),
+        default=0,
+    )
+    if qubits <= max_qubits and (qubits <= MPS_QUBITS or span > MPS_SPAN):
+        return "statevector"
+    t_gates = sum(operations.get(name, 0) for name in T_GATES)
+    if shots and set(operations) <= CLIFFORD_GATES | T_GATES and t_gates <= MAX_T_GATES:
+        return "extended_stabilizer"
+    return "matrix_product_state"
+
+
+def execute(
+    quantumimage: QuantumImage,
+    shots: int = 0,
+    method: str = "automatic",
+    seed: typing.Optional[int] = None,
+    **options: typing.Any,
+) -> ExecutionResult:
+    """Simulate the circuit of a quantum image with Aer and retrieve the image.
+
+    The circuit of the image is left untouched: it is transpiled through the transpile
+    cache, and the probabilities are saved, or the encoding qubits measured, on the copy
+    returned by the cache. The simulators keep the qubits in place, so the instructions
+    are added after the transpilation.
+
+    Args:
+        quantumimage (QuantumImage): Encoded, and possibly filtered, image.
+        shots (int): Number of measurements, if zero the exact probabilities are saved and a
+            single shot is run.
+        method (str): Aer simulation method, chosen by choose_method if "automatic".
+        seed (int): Seed of the simulator, for reproducible counts.
+        options (typing.Any): Other options of the AerSimulator.
+
+    Returns:
+        ExecutionResult: The retrieved image and the details of the execution.
+    """
+    from qiskit_aer import AerSimulator
+    from qiskit_aer.library import SaveProbabilities
+
+    if method == "automatic":
+        method = choose_method(quantumimage.circuit, shots)
+    simulator = AerSimulator(method=method, **options)
+    with stage(quantumimage.metrics, "transpile"):
+        circuit = cached_transpile(quantumimage.circuit, simulator)
+
+    qubits = [x + quantumimage.n_aux_qubit for x in range(quantumimage.total_qubits)]
+    if shots:
+        circuit.measure(qubits, list(range(quantumimage.total_qubits)))
+    else:
+        circuit.append(SaveProbabilities(len(qubits)), qubits)
+    with stage(quantumimage.metrics, "simulate"):
+        result = simulator.run(circuit, shots=shots or 1, seed_simulator=seed).result()
+
+    counts = result.get_counts(0) if shots else None
+    probabilities = quantumimage.probabilities(
+        counts if counts is not None else np.asarray(result.data(0)["probabilities"])
+    )
+    with stage(quantumimage.metrics, "retrieve"):
+        image = quantumimage.decode(probabilities)
+    return ExecutionResult(image, probabilities, method, shots, seed, counts, result)
@@ -0,0 +1,123 @@
+"""Process large images as tiles small enough to simulate, and stitch the results."""
+import math
+import typing
+
+import numpy as np
+
+from qimp.ImageEncoding.QuantumImage import QuantumImage
+from qimp.Instrumentation.Metrics import Metrics
+
+from .Batch import run_batch
+
+
+def split_tiles(
+    image: np.ndarray, side: int, halo: int = 0
+) -> typing.Tuple[np.ndarray, typing.Tuple[int, int]]:
+    """Split an image into square tiles of side 2^k overlapping by a halo.
+
+    Neighbouring tiles share 2 * halo rows or columns, so that the pixels a filter reads
+    around the core of a tile are part of it. The image is padded with zeros on the borders.
+
+    Args:
+        image (np.ndarray): Image to split.
+        side (int): Side of the tiles, a power of two.
+        halo (int): Pixels around the core of every tile.
+
+    Returns:
+        tuple: The tiles stacked along the first axis in row-major order, and the number of
+            tiles per column and per row.
+
+    Raises:
+        Exception: If the side is not a power of two or leaves no core.
+    """
+    if side < 1 or side & (side - 1):
+        raise Exception("The side of the tiles must be a power of two, got " + str(side))
+    stride = side - 2 * halo
+    if stride < 1:
+        raise Exception("The halo leaves no pixels in the tiles")
+    rows, cols = (math.ceil(length / stride) for length in image.shape)
+    padded = np.pad(
+        image,
+        (
+            (halo, halo + rows * stride - image.shape[0]),
+            (halo, halo + cols * stride - image.shape[1]),
+        ),
+    )
+    # a read only view of every tile, copied once by the stack
+    windows = np.lib.stride_tricks.sliding_window_view(padded, (side, side))
+    tiles = windows[::stride, ::stride].reshape(-1, side, side)
+    return np.array(tiles), (rows, cols)
+
+
+def stitch_tiles(
+    tiles: np.ndarray, grid: typing.Tuple[int, int], shape: typing.Tuple[int, int], halo: int = 0
+) -> np.ndarray:
+    """Rebuild an image from the cores of its tiles.
+
+    Args:
+        tiles (np.ndarray): Tiles stacked along the first axis, as returned by split_tiles.
+        grid (tuple): Number of tiles per column and per row.
+        shape (tuple): Shape of the original image.
+        halo (int): Pixels around the core of every tile, dropped.
+
+    Returns:
+        np.ndarray: The image.
+    """
+    rows, cols = grid
+    side = tiles.shape[-1]
+    cores = tiles[:, halo : side - halo, halo : side - halo]
+    stride = cores.shape[-1]
+    image = cores.reshape(rows, cols, stride, stride).swapaxes(1, 2)
+    return image.reshape(rows * stride, cols * stride)[: shape[0], : shape[1]]
+
+
+def run_tiled(
+    image: np.ndarray,
+    side: int = 16,
+    halo: int = 0,
+    encoding: str = "FRQI",
+    method: str = "",
+    shots: int = 0,
+    backend: typing.Any = None,
+    batch_size: int = 256,
+    metrics: typing.Optional[Metrics] = None,
+    transform: typing.Optional[typing.Callable[[QuantumImage], None]] = None,
+) -> np.ndarray:
+    """Encode, execute and retrieve an image tile by tile.
+
+    Each tile is encoded as its own QuantumImage, so the number of qubits only depends on
+    the side of the tiles. The tiles are run with run_batch, batch_size of them per job, and
+    the experiments of a job are simulated in parallel. Filters reading the neighbours of a
+    pixel need a halo, one pixel for the 3x3 stencil of sobel.
+
+    Args:
+        image (np.ndarray): Image to process.
+        side (int): Side of the tiles, a power of two.
+        halo (int): Pixels shared with the neighbouring tiles on every border.
+        encoding (str): "FRQI" or "NEQR".
+        method (str): Construction method of the encoding, defaults to the batch one.
+        shots (int): Number of measurements per tile, exact probabilities if zero.
+        backend (typing.Any): Aer backend, defaults to the statevector AerSimulator.
+        batch_size (int): Number of tiles per job, bounding the memory of a job.
+        metrics (Metrics): Records the time and resources of every stage, if given.
+        transform (typing.Callable): Applied to every encoded tile, such as a filter.
+
+    Returns:
+        np.ndarray: The retrieved image, with the shape of image.
+    """
+    tiles, grid = split_tiles(image, side, halo)
+    retrieved = np.concatenate(
+        [
+            run_batch(
+                list(tiles[start : start + batch_size]),
+                encoding,
+                method,
+                shots,
+                backend,
+                metrics=metrics,
+                transform=transform,
+            )
+            for start in range(0, len(tiles), batch_size)
+        ]
+    )
+    return stitch_tiles(retrieved, grid, (image.shape[0], image.shape[1]), halo)
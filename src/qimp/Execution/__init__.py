@@ -0,0 +1,2 @@
+"""Execution subpackage for qimp."""
+__version__ = "0.2.1"
@@ -0,0 +1,123 @@
+"""Quantum Hadamard edge detection, with a single ancilla."""
+import typing
+
+import numpy as np
+from qiskit.result import Result
+
+from qimp.ImageEncoding.QuantumImage import QuantumImage
+from qimp.Instrumentation.Metrics import Metrics, stage
+
+from .Filters import add_filter_qubits
+from .Gates import decrement
+
+EDGE_LABEL = "edges"
+
+
+def qhed(quantumImage: QuantumImage, axis: str = "x") -> None:
+    """Quantum Hadamard edge detection along one axis of an FRQI image.
+
+    An ancilla is added before the image and put in |+>. The ancilla and the coordinate of
+    the axis, the ancilla as lowest bit, are decremented, which pairs every pixel with the
+    next one along the axis, cyclically, and a Hadamard on the ancilla leaves the
+    difference of the amplitudes of the pair where it is one. With the colour qubit in one,
+    the amplitudes are the grey levels of the pixels, see retrieve_edges.
+
+    Args:
+        quantumImage (QuantumImage): Image encoded with FRQI.
+        axis (str): "x" to compare the pixels with the next column, "y" with the next row.
+
+    Returns: None
+
+    Raises:
+        Exception: If the image is not encoded with FRQI or the axis is unknown.
+    """
+    if quantumImage.encoding != "FRQI":
+        raise Exception("The edge detection needs an FRQI image, got " + quantumImage.encoding)
+    if axis not in ("x", "y"):
+        raise Exception("Unknown axis " + str(axis))
+    add_filter_qubits(quantumImage, 1, adder=False)
+    side_qubits = int(quantumImage.required_qubits / 2)
+    first = 1 + (side_qubits if axis == "y" else 0)
+    circuit = quantumImage.circuit
+    with stage(quantumImage.metrics, "qhed_" + axis, circuit):
+        circuit.h(0)
+        decrement(circuit, [], [0] + list(range(first, first + side_qubits)))
+        circuit.h(0)
+
+
+def save_edge_probabilities(quantumImage: QuantumImage) -> None:
+    """Save the exact probabilities of the ancilla and encoding qubits when simulated with Aer.
+
+    Args:
+        quantumImage (QuantumImage): Image filtered by qhed.
+
+    Returns: None
+    """
+    from qiskit_aer.library import SaveProbabilities
+
+    qubits = list(range(quantumImage.n_aux_qubit + quantumImage.total_qubits))
+    quantumImage.circuit.append(SaveProbabilities(len(qubits), label=EDGE_LABEL), qubits)
+
+
+def retrieve_edges(
+    quantumImage: QuantumImage, result: typing.Union[Result, np.ndarray]
+) -> np.ndarray:
+    """Rebuild the edge map from the probabilities of the ancilla and encoding qubits.
+
+    The probability of the ancilla and the colour qubit being one at a position is the
+    square of the difference between the grey levels of the pixel and of the next one,
+    divided by 4 * 255^2 times the number of positions.
+
+    Args:
+        quantumImage (QuantumImage): Image filtered by qhed.
+        result (Result): Result holding the probabilities saved by save_edge_probabilities,
+            or the probabilities themselves, the ancilla being the lowest bit.
+
+    Returns:
+        np.ndarray: Absolute difference of every pixel with the next one, between 0 and 255.
+    """
+    with stage(quantumImage.metrics, "retrieve"):
+        if isinstance(result, Result):
+            result = np.asarray(result.data(quantumImage.circuit)[EDGE_LABEL], dtype=float)
+        side = pow(2, int(quantumImage.required_qubits / 2))
+        differences = np.asarray(result, dtype=float).reshape(2, side, side, 2)[1, :, :, 1]
+        edges: np.ndarray = 2 * 255.0 * side * np.sqrt(differences)
+        return edges
+
+
+def detect_edges(
+    image: np.ndarray, backend: typing.Any = None, metrics: typing.Optional[Metrics] = None
+) -> typing.Tuple[np.ndarray, np.ndarray]:
+    """Horizontal and vertical edge maps of an image, from one job of two circuits.
+
+    Args:
+        image (np.ndarray): Image to filter.
+        backend (typing.Any): Aer backend, defaults to the statevector AerSimulator.
+        metrics (Metrics): Records the time and resources of every stage, if given.
+
+    Returns:
+        tuple: The differences with the next column, high on vertical edges, and with the
+            next row, high on horizontal edges.
+    """
+    from qiskit import transpile
+    from qiskit_aer import AerSimulator
+
+    from qimp.ImageEncoding.Encodings import FRQI
+
+    backend = backend or AerSimulator(method="statevector")
+    quantumimages = []
+    for axis in ("x", "y"):
+        quantumimage = QuantumImage(image, metrics=metrics)
+        FRQI(quantumimage, method="ucry")
+        qhed(quantumimage, axis)
+        save_edge_probabilities(quantumimage)
+        quantumimages.append(quantumimage)
+    with stage(metrics, "transpile"):
+        circuits = transpile([quantumimage.circuit for quantumimage in quantumimages], backend)
+    with stage(metrics, "simulate"):
+        result = backend.run(circuits, shots=1).result()
+    vertical, horizontal = (
+        retrieve_edges(quantumimage, np.asarray(result.data(index)[EDGE_LABEL], dtype=float))
+        for index, quantumimage in enumerate(quantumimages)
+    )
+    return vertical, horizontal
@@ -0,0 +1,245 @@
+"""NumPy emulation of the filter programs on the statevector of an encoded image."""
+import typing
+
+import numpy as np
+from qiskit.circuit.library import StatePreparation
+from qiskit.quantum_info import Operator
+
+from qimp.ImageEncoding.QuantumImage import QuantumImage
+
+from .Filters import SOBEL, SOBEL_AUX_QUBITS, Program
+
+# axes of the emulated state: top carry, colour, row, column, auxiliary qubits
+CARRY_AXIS, COLOR_AXIS, Y_AXIS, X_AXIS, AUX_AXIS = range(5)
+
+
+class Emulator(object):
+    """Statevector of an image and its auxiliary qubits, transformed without a circuit.
+
+    The qubits are ordered as in the circuits built by the filters: the auxiliary qubits,
+    the address and colour qubits of the encoding, then the top carry qubit, the only
+    ancilla of a translation that is not reset. The summing register is reset after every
+    translation and the other carries are restored, so they are always zero and left out.
+
+    A controlled translation adds the shift to a coordinate of the positions where its
+    auxiliary controls are all one, which is a cyclic roll of that axis of the state, and
+    flips the top carry where the sum overflows. The reset of the summing register
+    discards the previous coordinate, so the circuit is left in a mixed state; the
+    emulation keeps it pure, which gives the same distribution of every qubit as long as
+    no Hadamard follows a translation.
+
+    The "reversible" translations add modulo the side and clear the summing register
+    coherently instead, so every ancilla ends in zero and the emulated state is the exact
+    statevector of the circuit, Hadamards included, once the ancillas are projected out.
+    The "increment" ones add the shift in place with no ancilla. Neither has a top carry,
+    the carry axis then has a single value.
+    """
+
+    __slots__ = ("state", "side", "n_aux_qubit", "translated", "method")
+
+    def __init__(
+        self,
+        quantumimage: QuantumImage,
+        n_aux_qubit: int,
+        encoding: str = "",
+        method: str = "adder",
+    ) -> None:
+        """
+        Returns the emulator of an encoded image, its auxiliary qubits set to zero.
+
+        Args:
+            quantumimage (QuantumImage): Image whose encoded state is computed from its pixels,
+                it does not need a circuit.
+            n_aux_qubit (int): Number of auxiliary qubits.
+            encoding (str): "FRQI" or "NEQR", defaults to the encoding of the image.
+            method (str): Translation method of the emulated circuit, as in traslate_circuit.
+
+        Returns: None
+
+        Raises:
+            Exception: If the method is unknown.
+        """
+        if method not in ("adder", "reversible", "increment"):
+            raise Exception("Unknown translation method " + str(method))
+        self.method = method
+        encoded = quantumimage.statevector(encoding)
+        self.side = pow(2, int(quantumimage.required_qubits / 2))
+        self.n_aux_qubit = n_aux_qubit
+        self.translated = False
+        colors = len(encoded) // (self.side * self.side)
+        carries = 2 if method == "adder" else 1
+        self.state = np.zeros(
+            (carries, colors, self.side, self.side, pow(2, n_aux_qubit)), complex
+        )
+        self.state[0, :, :, :, 0] = encoded.reshape(colors, self.side, self.side)
+
+    def _aux_bit(self, qubit: int) -> np.ndarray:
+        """View of the state with the auxiliary qubit on an axis of its own, second to last."""
+        shape = self.state.shape[:AUX_AXIS]
+        return self.state.reshape(shape + (-1, 2, pow(2, qubit)))
+
+    def x(self, qubit: int) -> None:
+        """X gate on an auxiliary qubit."""
+        self.state = np.flip(self._aux_bit(qubit), axis=-2).reshape(self.state.shape)
+
+    def _check_coherent(self, name: str) -> None:
+        """Reject a gate mixing the auxiliary states after the resets of the adder."""
+        if self.translated and self.method == "adder":
+            raise Exception("The emulation cannot apply a " + name + " after a translation")
+
+    def h(self, qubit: int) -> None:
+        """Hadamard gate on an auxiliary qubit.
+
+        Raises:
+            Exception: If a translation of the "adder" method was already applied.
+        """
+        self._check_coherent("Hadamard")
+        view = self._aux_bit(qubit)
+        zero, one = view[..., 0, :], view[..., 1, :]
+        self.state = np.stack((zero + one, zero - one), axis=-2).reshape(
+            self.state.shape
+        ) / np.sqrt(2)
+
+    def unitary(self, matrix: np.ndarray, name: str) -> None:
+        """Apply a unitary to the whole auxiliary register.
+
+        Args:
+            matrix (np.ndarray): The unitary, the first auxiliary qubit being the lowest bit.
+            name (str): Name of the gate in the errors.
+
+        Returns: None
+
+        Raises:
+            Exception: If a translation of the "adder" method was already applied.
+        """
+        self._check_coherent(name)
+        self.state = self.state @ matrix.T
+
+    def prepare(self, amplitudes: typing.Sequence[float], inverse: bool = False) -> None:
+        """Prepare a state of the auxiliary register, as the StatePreparation of qiskit.
+
+        Args:
+            amplitudes (list): Amplitudes of the prepared state.
+            inverse (bool): Apply the inverse preparation.
+
+        Returns: None
+        """
+        matrix = Operator(StatePreparation(list(amplitudes))).data
+        self.unitary(matrix.conj().T if inverse else matrix, "state preparation")
+
+    def diagonal(self, phases: typing.Sequence[complex]) -> None:
+        """Multiply every state of the auxiliary register by a phase.
+
+        Args:
+            phases (list): Phases of the auxiliary states.
+
+        Returns: None
+        """
+        self.state = self.state * np.asarray(phases)
+
+    def translate(
+        self,
+        axis: str,
+        shift: int,
+        skip: bool = False,
+        controls: typing.Optional[typing.Sequence[int]] = None,
+    ) -> None:
+        """Controlled cyclic translation of the image.
+
+        Args:
+            axis (str): "x" to move along the columns, "y" along the rows.
+            shift (int): Positions to add to the coordinate, modulo the side.
+            skip (bool): Control on all the auxiliary qubits but the last one.
+            controls (list): Auxiliary qubits controlling the translation, in place of skip.
+
+        Returns: None
+        """
+        shift %= self.side
+        if controls is None:
+            controls = range(self.n_aux_qubit - (1 if skip else 0))
+        mask = sum(pow(2, qubit) for qubit in controls)
+        active = [value for value in range(self.state.shape[AUX_AXIS]) if value & mask == mask]
+        coordinate = X_AXIS if axis == "x" else Y_AXIS
+        moved = self.state[..., active]
+        if self.method == "adder":
+            # the coordinates that overflow flip the top carry
+            overflow = [slice(None)] * moved.ndim
+            overflow[coordinate] = slice(self.side - shift, self.side)
+            moved[tuple(overflow)] = moved[tuple(overflow)][::-1]
+        self.state[..., active] = np.roll(moved, shift, axis=coordinate)
+        self.translated = True
+
+    def run(self, program: Program) -> None:
+        """Apply a filter program.
+
+        Args:
+            program (Program): Operations of the filter, as in the Filters module.
+
+        Returns: None
+
+        Raises:
+            Exception: If an operation is unknown.
+        """
+        for operation in program:
+            if operation[0] == "x":
+                self.x(operation[1])
+            elif operation[0] == "h":
+                self.h(operation[1])
+            elif operation[0] == "translate":
+                self.translate(*operation[1:])
+            elif operation[0] == "ctranslate":
+                self.translate(operation[1], operation[2], controls=operation[3])
+            elif operation[0] == "prepare":
+                self.prepare(operation[1])
+            elif operation[0] == "unprepare":
+                self.prepare(operation[1], inverse=True)
+            elif operation[0] == "diagonal":
+                self.diagonal(operation[1])
+            elif operation[0] != "barrier":
+                raise Exception("Unknown filter operation " + str(operation[0]))
+
+    def statevector(self) -> np.ndarray:
+        """Amplitudes of the auxiliary, address, colour and top carry qubits, if any.
+
+        Returns:
+            np.ndarray: The state, qubit 0 being the first auxiliary qubit.
+        """
+        return self.state.reshape(-1)
+
+    def probabilities(self) -> np.ndarray:
+        """Probabilities of the auxiliary, address, colour and top carry qubits.
+
+        Returns:
+            np.ndarray: The distribution, in the order of statevector().
+        """
+        return typing.cast(np.ndarray, np.abs(self.statevector()) ** 2)
+
+    def encoding_probabilities(self) -> np.ndarray:
+        """Probabilities of the address and colour qubits, to be passed to retrieve().
+
+        Returns:
+            np.ndarray: The marginal distribution of the encoding qubits.
+        """
+        probabilities = np.abs(self.state) ** 2
+        return typing.cast(np.ndarray, probabilities.sum(axis=(CARRY_AXIS, AUX_AXIS)).reshape(-1))
+
+
+def emulate_sobel(
+    quantumimage: QuantumImage, encoding: str = "", method: str = "adder"
+) -> Emulator:
+    """Emulate the Sobel filter on an encoded image.
+
+    The image does not need a circuit, only its encoding, so much larger images can be
+    filtered than the ones that can be simulated.
+
+    Args:
+        quantumimage (QuantumImage): Image to filter.
+        encoding (str): "FRQI" or "NEQR", defaults to the encoding of the image.
+        method (str): Translation method of the emulated circuit, as in traslate_circuit.
+
+    Returns:
+        Emulator: The emulated state after the filter.
+    """
+    emulator = Emulator(quantumimage, SOBEL_AUX_QUBITS, encoding, method)
+    emulator.run(SOBEL)
+    return emulator
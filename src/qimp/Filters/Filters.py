@@ -1,77 +1,148 @@
+import typing
+
+from qiskit.circuit.library import Diagonal, StatePreparation
+
+from qimp.ImageEncoding.Operations import OpList, Target
 from qimp.ImageEncoding.QuantumImage import QuantumImage
 
 from .Gates import traslate_circuit
 
+# operations of a filter on the auxiliary qubits and the image:
+# ("x", aux qubit), ("h", aux qubit), ("barrier",), ("translate", axis, shift, skip),
+# ("ctranslate", axis, shift, controls) controlled by a list of auxiliary qubits,
+# ("prepare", amplitudes) and ("unprepare", amplitudes) of the auxiliary register, from and
+# to zero, and ("diagonal", phases) on the auxiliary register
+# a translation shift is taken modulo the side of the image, so -1 moves by side - 1
+Program = typing.List[tuple]
+
+SOBEL_AUX_QUBITS = 4
+
+SOBEL: Program = [
+    ("translate", "x", -1, False),
+    ("translate", "y", -1, False),
+    ("x", 3),  # 1110    0001
+    ("barrier",),
+    ("translate", "x", -1, False),
+    ("translate", "y", 1, False),
+    ("x", 3),
+    ("x", 2),  # 1101     0010
+    ("translate", "x", -1, True),
+    ("x", 1),
+    ("translate", "x", 1, True),
+    ("x", 2),
+    ("translate", "y", -1, False),
+    ("translate", "x", 1, False),
+    ("x", 3),
+    ("translate", "x", 1, False),
+    ("translate", "y", 1, False),
+    ("x", 1),
+    ("x", 3),
+    ("x", 0),
+    ("barrier",),
+    ("translate", "y", -1, False),
+    ("translate", "x", -1, False),
+    ("x", 3),  # 1110    0001
+    ("barrier",),
+    ("translate", "y", -1, False),
+    ("translate", "x", 1, False),
+    ("x", 3),
+    ("x", 2),  # 1101     0010
+    ("translate", "y", -1, True),
+    ("x", 1),
+    ("translate", "y", 1, True),
+    ("x", 2),
+    ("translate", "x", -1, False),
+    ("translate", "y", 1, False),
+    ("x", 3),
+    ("translate", "y", 1, False),
+    ("translate", "x", 1, False),
+    ("x", 1),
+    ("x", 3),
+    ("x", 0),
+    ("barrier",),
+]
 
-def sobel(quantumImage: QuantumImage) -> None:
-    """Quantum implementation of the Sobel filter, it takes in input a quantum image object and
-        applies the required transformations.
 
+def run_program(
+    quantumImage: QuantumImage, program: Program, circ: Target, method: str = "adder"
+) -> None:
+    """Write the gates of a filter program.
 
     Args:
-        quantumImage (QuantumImage): Input quantum image.
+        quantumImage (QuantumImage): Image with its auxiliary, summing and carry qubits.
+        program (Program): Operations of the filter.
+        circ (Target): Where to write the gates.
+        method (str): Translation method, as in traslate_circuit.
+
+    Returns: None
+
+    Raises:
+        Exception: If an operation is unknown.
+    """
+    side = int(pow(2, int(quantumImage.required_qubits) / 2))
+    aux = list(range(quantumImage.n_aux_qubit))
+    for operation in program:
+        if operation[0] == "x":
+            circ.x(operation[1])
+        elif operation[0] == "h":
+            circ.h(operation[1])
+        elif operation[0] == "barrier":
+            circ.barrier()
+        elif operation[0] == "translate":
+            _, axis, shift, skip = operation
+            traslate_circuit(quantumImage, axis, shift % side, skip, circ, method)
+        elif operation[0] == "ctranslate":
+            _, axis, shift, controls = operation
+            traslate_circuit(
+                quantumImage, axis, shift % side, circ=circ, method=method, controls=list(controls)
+            )
+        elif operation[0] == "prepare":
+            circ.append(StatePreparation(list(operation[1])), aux)
+        elif operation[0] == "unprepare":
+            circ.append(StatePreparation(list(operation[1])).inverse(), aux)
+        elif operation[0] == "diagonal":
+            circ.append(Diagonal(list(operation[1])), aux)
+        else:
+            raise Exception("Unknown filter operation " + str(operation[0]))
+
+
+def add_filter_qubits(quantumImage: QuantumImage, n_aux_qubit: int, adder: bool = True) -> None:
+    """Add the auxiliary qubits before the image and the adder registers after it.
+
+    Args:
+        quantumImage (QuantumImage): Encoded quantum image.
+        n_aux_qubit (int): Number of auxiliary qubits.
+        adder (bool): Also add the summing and carry registers of the adder translations.
+
+    Returns: None
     """
     quantumImage.reverse()
-    quantumImage.add_qubits(4, "aux")
-    quantumImage.n_aux_qubit = 4
+    quantumImage.add_qubits(n_aux_qubit, "aux")
+    quantumImage.n_aux_qubit = n_aux_qubit
     quantumImage.reverse()
 
+    if not adder:
+        return
     quantumImage.num_summing = int(quantumImage.required_qubits / 2)
     quantumImage.num_carry = quantumImage.num_summing + 1
-    quantumImage.add_qubits(quantumImage.num_summing)
-    quantumImage.add_qubits(quantumImage.num_carry)
+    quantumImage.add_qubits(quantumImage.num_summing, "summing")
+    quantumImage.add_qubits(quantumImage.num_carry, "carry")
+
+
+def sobel(quantumImage: QuantumImage, method: str = "adder") -> None:
+    """Quantum implementation of the Sobel filter, it takes in input a quantum image object and
+        applies the required transformations.
+
+
+    Args:
+        quantumImage (QuantumImage): Input quantum image.
+        method (str): Translation method, as in traslate_circuit. The "reversible" and
+            "increment" translations leave no reset in the circuit, which is then simulated
+            in a single statevector pass. The "increment" ones also need no summing and carry
+            registers, 2n + 1 qubits less for a 2^n x 2^n image.
+    """
+    add_filter_qubits(quantumImage, SOBEL_AUX_QUBITS, method != "increment")
+    ops = OpList(quantumImage.circuit.num_qubits)
     # quantumImage.draw_circuit()
-    print("Traslating")
-    traslate_circuit(quantumImage, "x", int(pow(2, int(quantumImage.required_qubits) / 2) - 1))
-    print("#1")
-    traslate_circuit(quantumImage, "y", int(pow(2, int(quantumImage.required_qubits) / 2) - 1))
-
-    quantumImage.circuit.x(3)  # 1110    0001
-    quantumImage.circuit.barrier()
-    traslate_circuit(quantumImage, "x", int(pow(2, int(quantumImage.required_qubits) / 2) - 1))
-    traslate_circuit(quantumImage, "y", 1)
-    quantumImage.circuit.x(3)
-    quantumImage.circuit.x(2)  # 1101     0010
-    traslate_circuit(
-        quantumImage, "x", int(pow(2, int(quantumImage.required_qubits) / 2) - 1), True
-    )
-
-    quantumImage.circuit.x(1)
-    traslate_circuit(quantumImage, "x", 1, True)
-    quantumImage.circuit.x(2)
-    traslate_circuit(quantumImage, "y", int(pow(2, int(quantumImage.required_qubits) / 2) - 1))
-    traslate_circuit(quantumImage, "x", 1)
-
-    quantumImage.circuit.x(3)
-    traslate_circuit(quantumImage, "x", 1)
-    traslate_circuit(quantumImage, "y", 1)
-    quantumImage.circuit.x(1)
-    quantumImage.circuit.x(3)
-
-    quantumImage.circuit.x(0)
-    quantumImage.circuit.barrier()
-    traslate_circuit(quantumImage, "y", int(pow(2, int(quantumImage.required_qubits) / 2) - 1))
-    traslate_circuit(quantumImage, "x", int(pow(2, int(quantumImage.required_qubits) / 2) - 1))
-    quantumImage.circuit.x(3)  # 1110    0001
-    quantumImage.circuit.barrier()
-    traslate_circuit(quantumImage, "y", int(pow(2, int(quantumImage.required_qubits) / 2) - 1))
-    traslate_circuit(quantumImage, "x", 1)
-    quantumImage.circuit.x(3)
-    quantumImage.circuit.x(2)  # 1101     0010
-    traslate_circuit(
-        quantumImage, "y", int(pow(2, int(quantumImage.required_qubits) / 2) - 1), True
-    )
-
-    quantumImage.circuit.x(1)
-    traslate_circuit(quantumImage, "y", 1, True)
-    quantumImage.circuit.x(2)
-    traslate_circuit(quantumImage, "x", int(pow(2, int(quantumImage.required_qubits) / 2) - 1))
-    traslate_circuit(quantumImage, "y", 1)
-
-    quantumImage.circuit.x(3)
-    traslate_circuit(quantumImage, "y", 1)
-    traslate_circuit(quantumImage, "x", 1)
-    quantumImage.circuit.x(1)
-    quantumImage.circuit.x(3)
-    quantumImage.circuit.x(0)
-    quantumImage.circuit.barrier()
+    run_program(quantumImage, SOBEL, ops, method)
+    ops.materialise(quantumImage.circuit)
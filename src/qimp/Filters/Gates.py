@@ -1,8 +1,19 @@
+import functools
+import os
+import typing
+
 import qiskit
-from qiskit import QuantumCircuit, QuantumRegister
+from qiskit import QuantumCircuit, QuantumRegister, qpy
 from qiskit.circuit import ControlledGate
 
 import qimp.ImageEncoding.QuantumImage
+from qimp.ImageEncoding.Operations import OpList, Target
+from qimp.Instrumentation.Metrics import stage
+
+# number of controlled translations kept in memory
+TRANSLATION_CACHE_SIZE = 32
+# directory of the on-disk store of the controlled translations, disabled when empty
+translation_cache_dir: typing.Optional[str] = os.environ.get("QIMP_GATE_CACHE")
 
 
 def make_sum_gate() -> qiskit.QuantumCircuit:
@@ -19,7 +30,10 @@ def make_sum_gate() -> qiskit.QuantumCircuit:
     return summing
 
 
-summing_gate = make_sum_gate()
+@functools.lru_cache(maxsize=None)
+def get_summing_gate() -> qiskit.QuantumCircuit:
+    """Sum gate shared by the translations, built on first use."""
+    return make_sum_gate()
 
 
 def make_carry_gate() -> qiskit.QuantumCircuit:
@@ -39,37 +53,66 @@ def make_carry_gate() -> qiskit.QuantumCircuit:
     return carry
 
 
-carry_gate = make_carry_gate()
+@functools.lru_cache(maxsize=None)
+def get_carry_gate() -> qiskit.QuantumCircuit:
+    """Carry gate shared by the translations, built on first use."""
+    return make_carry_gate()
 
 
-def make_translation(
-    num_summing: int, num_carry: int, auxiliary: int, skipped: bool
-) -> ControlledGate:
+def __getattr__(name: str) -> typing.Any:
+    """Build the module level gates on first access.
+
+    Args:
+        name (str): Name of the module attribute.
+
+    Returns:
+        typing.Any: The requested gate.
+
+    Raises:
+        AttributeError: If the attribute does not exist.
     """
-    Create traslation circuit.
+    if name == "summing_gate":
+        return get_summing_gate()
+    if name == "carry_gate":
+        return get_carry_gate()
+    raise AttributeError("module " + repr(__name__) + " has no attribute " + repr(name))
+
+
+def make_adder_circuit(
+    num_summing: int, num_carry: int, overflow: bool = True
+) -> qiskit.QuantumCircuit:
+    """
+    Create the ripple-carry adder, it adds the first register to the second one.
+
+    The first register and the carries are restored, but the last carry, which is flipped
+    when the sum overflows. Without overflow the sum is taken modulo the size of the
+    registers: the carry out of the last bit is never computed and the last carry is left
+    untouched.
 
     Args:
         num_summing (int): number of wires
         num_carry (int): number of wires +1
-        auxiliary (int): auxiliary qubits
-        skipped (bool): skip one of the auxiliary qubits or not
+        overflow (bool): flip the last carry when the sum overflows
 
-    Returns: Gate
+    Returns: QuantumCircuit
 
     """
     original = QuantumRegister(num_summing, "original")
     shift = QuantumRegister(num_summing, "shift")
     carryqubits = QuantumRegister(num_carry, "carry")
     translation = QuantumCircuit(original, shift, carryqubits, name="Traslation")
+    carry_gate = get_carry_gate()
+    summing_gate = get_summing_gate()
 
-    for index in range(num_summing):
+    for index in range(num_summing if overflow else num_summing - 1):
         translation.compose(
             carry_gate,
             [index + 2 * num_summing, index, index + num_summing, index + 2 * num_summing + 1],
             inplace=True,
         )
         # translation.cx(index,index+num_summing)
-    translation.cx(num_summing - 1, 2 * num_summing - 1)
+    if overflow:
+        translation.cx(num_summing - 1, 2 * num_summing - 1)
     for index in reversed(range(num_summing)):
         carry_sum = translation.num_qubits - (num_carry - index - 1) - 1
         add_1 = index
@@ -82,39 +125,209 @@ def make_translation(
                 carry_gate.inverse(), [carry_sum, add_1, add_2, carry_post], inplace=True
             )
         translation.compose(summing_gate, [carry_sum, add_1, add_2], inplace=True)
-    print("carry and sum gates added")
+    return translation
+
+
+def make_translation_circuit(num_summing: int, num_carry: int) -> qiskit.QuantumCircuit:
+    """
+    Create the uncontrolled traslation circuit, a ripple-carry adder followed by swaps.
+
+    Args:
+        num_summing (int): number of wires
+        num_carry (int): number of wires +1
+
+    Returns: QuantumCircuit
+
+    """
+    translation = make_adder_circuit(num_summing, num_carry)
     for index in range(num_summing):
         translation.swap(index, num_summing + index)
-    print("swap gates added")
-    print(auxiliary)
-    controlled_translation = translation.to_gate().control(auxiliary)
-    controlled_translation_skipped = translation.to_gate().control(auxiliary - 1)
-    print("gate made")
-    if skipped:
-        return controlled_translation_skipped
+    return translation
+
+
+def set_translation_cache_dir(path: typing.Optional[str]) -> None:
+    """
+    Store the controlled translations on disk, as QPY files, to reuse them across processes.
+
+    Args:
+        path (str): Directory of the store, None disables it.
+
+    Returns: None
+    """
+    global translation_cache_dir
+    translation_cache_dir = path
+
+
+def _translation_path(
+    num_summing: int, num_carry: int, auxiliary: int, skipped: bool, swapped: bool
+) -> str:
+    name = "translation_{}_{}_{}_{}{}_qpy{}_qiskit{}.qpy".format(
+        num_summing,
+        num_carry,
+        auxiliary,
+        int(skipped),
+        "" if swapped else "_modular",
+        qpy.QPY_VERSION,
+        qiskit.__version__,
+    )
+    return os.path.join(typing.cast(str, translation_cache_dir), name)
+
+
+@functools.lru_cache(maxsize=TRANSLATION_CACHE_SIZE)
+def get_translation(
+    num_summing: int, num_carry: int, auxiliary: int, skipped: bool, swapped: bool = True
+) -> ControlledGate:
+    """
+    Controlled traslation gate, synthesised once per set of parameters.
+
+    The gates are kept in a bounded LRU cache and, if set_translation_cache_dir() was
+    called, in an on-disk store.
+
+    Args:
+        num_summing (int): number of wires
+        num_carry (int): number of wires +1
+        auxiliary (int): auxiliary qubits
+        skipped (bool): skip one of the auxiliary qubits or not
+        swapped (bool): swap the registers after the sum, or control the bare adder
+            modulo the size of the registers, which leaves the last carry untouched
+
+    Returns: Gate
+
+    """
+    path = ""
+    if translation_cache_dir:
+        path = _translation_path(num_summing, num_carry, auxiliary, skipped, swapped)
+        if os.path.exists(path):
+            with open(path, "rb") as file:
+                return typing.cast(ControlledGate, qpy.load(file)[0].data[0].operation)
+
+    if swapped:
+        translation = make_translation_circuit(num_summing, num_carry)
     else:
-        return controlled_translation
+        translation = make_adder_circuit(num_summing, num_carry, overflow=False)
+    controlled_translation = translation.to_gate().control(auxiliary - 1 if skipped else auxiliary)
+
+    if path:
+        os.makedirs(typing.cast(str, translation_cache_dir), exist_ok=True)
+        stored = QuantumCircuit(controlled_translation.num_qubits)
+        stored.append(controlled_translation, stored.qubits)
+        with open(path, "wb") as file:
+            qpy.dump(stored, file)
+    return controlled_translation
 
 
-def encode_number(quantumImage: qimp.ImageEncoding.QuantumImage.QuantumImage, shift: int) -> None:
+def make_translation(
+    num_summing: int, num_carry: int, auxiliary: int, skipped: bool, swapped: bool = True
+) -> ControlledGate:
+    """
+    Create traslation circuit.
+
+    Args:
+        num_summing (int): number of wires
+        num_carry (int): number of wires +1
+        auxiliary (int): auxiliary qubits
+        skipped (bool): skip one of the auxiliary qubits or not
+        swapped (bool): swap the registers after the sum, or control the bare adder
+            modulo the size of the registers, which leaves the last carry untouched
+
+    Returns: Gate
+
+    """
+    return get_translation(num_summing, num_carry, auxiliary, skipped, swapped)
+
+
+def encode_number(
+    quantumImage: qimp.ImageEncoding.QuantumImage.QuantumImage,
+    shift: int,
+    circ: typing.Optional[Target] = None,
+) -> None:
     """
     Encode number in binary with x gates.
 
     Args:
         quantumImage (qimp.ImageEncoding.QuantumImage.QuantumImage): The quantum image object.
         shift (int): The number to be encoded.
+        circ (Target): Where to write the gates, the circuit of the image by default.
 
     Returns: None
     """
+    if circ is None:
+        circ = quantumImage.circuit
     number = format(shift, "0" + str(quantumImage.num_summing) + "b")
     for index, element in enumerate(number[::-1]):
         if element == "1":
-            # print("SI, shift["+str(index)+"]")
-            print("total qubits: " + str(quantumImage.total_qubits + quantumImage.n_aux_qubit))
-            print(quantumImage.total_qubits + index)
-            quantumImage.circuit.x(
-                quantumImage.total_qubits + quantumImage.n_aux_qubit + index
-            )  # da fare fuori
+            circ.x(quantumImage.total_qubits + quantumImage.n_aux_qubit + index)  # da fare fuori
+
+
+def increment(circ: Target, controls: typing.List[int], register: typing.List[int]) -> None:
+    """
+    Add one to a register, modulo its size, with a cascade of multi-controlled X gates.
+
+    Every bit, from the most significant one, flips when all the lower bits are one.
+
+    Args:
+        circ (Target): Target circuit or gate list.
+        controls (list): The register is incremented only when these qubits are all one.
+        register (list): Qubits of the register, the least significant first.
+
+    Returns: None
+    """
+    for index in reversed(range(len(register))):
+        flip_controls = controls + register[:index]
+        if flip_controls:
+            circ.mcx(flip_controls, register[index])
+        else:
+            circ.x(register[index])
+
+
+def decrement(circ: Target, controls: typing.List[int], register: typing.List[int]) -> None:
+    """
+    Subtract one from a register, modulo its size, the gates of increment in reverse order.
+
+    Args:
+        circ (Target): Target circuit or gate list.
+        controls (list): The register is decremented only when these qubits are all one.
+        register (list): Qubits of the register, the least significant first.
+
+    Returns: None
+    """
+    for index in range(len(register)):
+        flip_controls = controls + register[:index]
+        if flip_controls:
+            circ.mcx(flip_controls, register[index])
+        else:
+            circ.x(register[index])
+
+
+def add_constant(
+    circ: Target, controls: typing.List[int], register: typing.List[int], shift: int
+) -> None:
+    """
+    Add a constant to a register, modulo its size, without ancillas.
+
+    Adding 2^k increments the bits from k upwards, so the constant is added with one
+    increment per set bit, or subtracted as its complement with one decrement per set bit
+    of the complement, whichever is shorter; a shift by -1 is a single decrement.
+
+    Args:
+        circ (Target): Target circuit or gate list.
+        controls (list): The constant is added only when these qubits are all one.
+        register (list): Qubits of the register, the least significant first.
+        shift (int): The constant.
+
+    Returns: None
+    """
+    size = pow(2, len(register))
+    shift %= size
+    complement = (size - shift) % size
+    if bin(shift).count("1") <= bin(complement).count("1"):
+        for bit in range(len(register)):
+            if shift >> bit & 1:
+                increment(circ, controls, register[bit:])
+    else:
+        for bit in range(len(register)):
+            if complement >> bit & 1:
+                decrement(circ, controls, register[bit:])
 
 
 def traslate_circuit(
@@ -122,6 +335,9 @@ def traslate_circuit(
     axis: str,
     shift: int,
     skip: bool = False,
+    circ: typing.Optional[Target] = None,
+    method: str = "adder",
+    controls: typing.Optional[typing.List[int]] = None,
 ) -> None:
     """
     Create a traslation circuit.
@@ -131,50 +347,110 @@ def traslate_circuit(
         axis (str): axis on which to perform traslation
         shift (int): number of positions to shift
         skip (bool): True if control is on 3 rather than 4 qubits
+        circ (Target): Where to write the gates, the circuit of the image by default.
+        method (str): "adder" loads the shift in the summing register and adds it with the
+            ripple-carry adder, then resets the summing register. "reversible" adds the
+            summing register to the coordinate in place, modulo the side, and clears it by
+            loading the shift again, so the circuit has no reset and every ancilla ends in
+            zero. "increment" adds the constant with add_constant, it needs no summing or
+            carry register and no reset.
+        controls (list): Qubits controlling the translation in place of the auxiliary ones,
+            skip is then ignored.
 
     Returns: None
 
+    Raises:
+        Exception: If the method is unknown.
+
     """
-    print("encoding")
-    encode_number(quantumImage, shift)
-    print("Post encoding")
-    control_qubits = [i for i in range(quantumImage.n_aux_qubit - (0 if not skip else 1))]
-    print("#1")
+    if method not in ("adder", "reversible", "increment"):
+        raise Exception("Unknown translation method " + str(method))
+    if circ is None:
+        circ = quantumImage.circuit
+    if controls is None:
+        controls = list(range(quantumImage.n_aux_qubit - (1 if skip else 0)))
+    described = circ if isinstance(circ, QuantumCircuit) else None
+    with stage(quantumImage.metrics, "translation_" + axis, described) as record:
+        _translate(quantumImage, axis, shift, circ, method, controls)
+        if record is not None and isinstance(circ, OpList):
+            # the gates are still in the list, count them there rather than building the
+            # circuit, the depth is left out
+            record["gates"] = quantumImage.circuit.size() + circ.size()
+            record["qubits"] = quantumImage.circuit.num_qubits
+
+
+def _translate(
+    quantumImage: qimp.ImageEncoding.QuantumImage.QuantumImage,
+    axis: str,
+    shift: int,
+    circ: Target,
+    method: str,
+    controls: typing.List[int],
+) -> None:
+    """Write the gates of a translation, see traslate_circuit."""
+    if method == "increment":
+        side_qubits = int(quantumImage.required_qubits / 2)
+        first = quantumImage.n_aux_qubit + (side_qubits if axis == "y" else 0)
+        add_constant(
+            circ,
+            controls,
+            list(range(first, first + side_qubits)),
+            shift,
+        )
+        return
+    encode_number(quantumImage, shift, circ)
+    control_qubits = controls
+    axis_qubits: typing.List[int] = []
     if axis == "x":
-        control_qubits = control_qubits + [
+        axis_qubits = [
             i
             for i in range(
                 quantumImage.n_aux_qubit, quantumImage.n_aux_qubit + quantumImage.num_summing
             )
         ]
-        print("#2")
     elif axis == "y":
-        control_qubits = control_qubits + [
+        axis_qubits = [
             i
             for i in range(
                 quantumImage.n_aux_qubit + quantumImage.num_summing,
                 quantumImage.n_aux_qubit + 2 * quantumImage.num_summing,
             )
         ]
-        print("#2")
-    control_qubits = control_qubits + [
+    summing_qubits = [
         i
         for i in range(
             quantumImage.n_aux_qubit + quantumImage.total_qubits,
+            quantumImage.n_aux_qubit + quantumImage.total_qubits + quantumImage.num_summing,
+        )
+    ]
+    carry_qubits = [
+        i
+        for i in range(
+            quantumImage.n_aux_qubit + quantumImage.total_qubits + quantumImage.num_summing,
             quantumImage.n_aux_qubit
             + quantumImage.total_qubits
             + quantumImage.num_summing
             + quantumImage.num_carry,
         )
     ]
-    print("#3")
-    quantumImage.circuit.append(
-        make_translation(
-            quantumImage.num_summing, quantumImage.num_carry, quantumImage.n_aux_qubit, skip
-        ),
-        control_qubits,
+    if method == "reversible":
+        # the shift is added to the coordinate and stays in the summing register,
+        # so the same x gates clear it whether the controls fired or not
+        circ.append(
+            make_translation(
+                quantumImage.num_summing,
+                quantumImage.num_carry,
+                len(controls),
+                False,
+                swapped=False,
+            ),
+            control_qubits + summing_qubits + axis_qubits + carry_qubits,
+        )
+        encode_number(quantumImage, shift, circ)
+        return
+    circ.append(
+        make_translation(quantumImage.num_summing, quantumImage.num_carry, len(controls), False),
+        control_qubits + axis_qubits + summing_qubits + carry_qubits,
     )
-    print("#4")
     for index in range(quantumImage.num_summing):
-        quantumImage.circuit.reset(quantumImage.n_aux_qubit + quantumImage.total_qubits + index)
-    print("#5")
+        circ.reset(quantumImage.n_aux_qubit + quantumImage.total_qubits + index)
@@ -0,0 +1,134 @@
+"""Compile convolution kernels into filter programs, as linear combinations of translations."""
+import math
+import typing
+
+import numpy as np
+
+from qimp.ImageEncoding.Operations import OpList
+from qimp.ImageEncoding.QuantumImage import QuantumImage
+
+from .Filters import Program, add_filter_qubits, run_program
+
+KERNELS: typing.Dict[str, np.ndarray] = {
+    "sobel_x": np.array([[-1, 0, 1], [-2, 0, 2], [-1, 0, 1]]),
+    "sobel_y": np.array([[-1, -2, -1], [0, 0, 0], [1, 2, 1]]),
+    "prewitt_x": np.array([[-1, 0, 1], [-1, 0, 1], [-1, 0, 1]]),
+    "prewitt_y": np.array([[-1, -1, -1], [0, 0, 0], [1, 1, 1]]),
+    "laplacian": np.array([[0, 1, 0], [1, -4, 1], [0, 1, 0]]),
+    "gaussian": np.array([[1, 2, 1], [2, 4, 2], [1, 2, 1]]) / 16,
+}
+
+
+def _codes(offsets: typing.Iterable[int]) -> typing.Tuple[typing.Dict[int, int], int]:
+    """Number the distinct offsets of an axis, the offset 0 first so that it needs no gate.
+
+    Args:
+        offsets (typing.Iterable[int]): Offsets of the non zero taps along the axis.
+
+    Returns:
+        tuple: The code of every offset and the number of qubits of the codes.
+    """
+    values = sorted(set(offsets), key=lambda offset: (offset != 0, offset))
+    return {offset: code for code, offset in enumerate(values)}, math.ceil(math.log2(len(values)))
+
+
+def _select(axis: str, shift: int, code: int, qubits: typing.List[int]) -> Program:
+    """Translation controlled by one code of a register of auxiliary qubits.
+
+    Args:
+        axis (str): "x" or "y".
+        shift (int): Positions to add to the coordinate.
+        code (int): Value of the register selecting the translation.
+        qubits (list): Qubits of the register, the least significant first.
+
+    Returns:
+        Program: The translation wrapped in the X gates matching the code.
+    """
+    toggles: Program = [
+        ("x", qubit) for index, qubit in enumerate(qubits) if not code >> index & 1
+    ]
+    return toggles + [("ctranslate", axis, shift, tuple(qubits))] + toggles
+
+
+def compile_kernel(kernel: np.ndarray) -> typing.Tuple[int, Program]:
+    """Compile a correlation kernel into a filter program.
+
+    The centre of the kernel reads the pixel itself, and the tap at row i, column j the one
+    i - rows // 2 rows below and j - cols // 2 columns right, as scipy.ndimage.correlate
+    with mode="wrap". The auxiliary register holds a column code and a row code, the column
+    code in the lowest qubits. The program prepares the register with the square roots of
+    the magnitudes of the taps, flips the phase of the negative ones, translates the image
+    once per distinct non zero column offset and once per distinct non zero row offset of
+    the non zero taps, controlled by the matching code, and undoes the preparation. Once
+    the register is projected on zero, the image amplitudes are the correlation of the
+    original ones divided by the sum of the magnitudes of the taps.
+
+    Args:
+        kernel (np.ndarray): Real two dimensional kernel.
+
+    Returns:
+        tuple: The number of auxiliary qubits and the program.
+
+    Raises:
+        Exception: If the kernel is not two dimensional or has no non zero tap.
+    """
+    kernel = np.asarray(kernel, dtype=float)
+    if kernel.ndim != 2:
+        raise Exception("The kernel must be two dimensional, got " + str(kernel.ndim))
+    taps = [
+        (row - kernel.shape[0] // 2, col - kernel.shape[1] // 2, kernel[row, col])
+        for row, col in zip(*np.nonzero(kernel))
+    ]
+    if not taps:
+        raise Exception("The kernel has no non zero tap")
+
+    x_codes, x_bits = _codes(dx for _, dx, _ in taps)
+    y_codes, y_bits = _codes(dy for dy, _, _ in taps)
+    n_aux_qubit = x_bits + y_bits
+    x_qubits = list(range(x_bits))
+    y_qubits = list(range(x_bits, n_aux_qubit))
+
+    amplitudes = np.zeros(pow(2, n_aux_qubit))
+    phases = np.ones(pow(2, n_aux_qubit))
+    for dy, dx, weight in taps:
+        index = x_codes[dx] + (y_codes[dy] << x_bits)
+        amplitudes[index] = math.sqrt(abs(weight))
+        phases[index] = np.sign(weight)
+    amplitudes /= np.linalg.norm(amplitudes)
+
+    program: Program = []
+    if n_aux_qubit:
+        program.append(("prepare", tuple(amplitudes)))
+    # with a single tap there is no register, and its sign is a global phase
+    if n_aux_qubit and (phases < 0).any():
+        program.append(("diagonal", tuple(phases)))
+    # a tap reading the pixel at +d moves the image by -d
+    for dx, code in x_codes.items():
+        if dx:
+            program += _select("x", -dx, code, x_qubits)
+    for dy, code in y_codes.items():
+        if dy:
+            program += _select("y", -dy, code, y_qubits)
+    if n_aux_qubit:
+        program.append(("unprepare", tuple(amplitudes)))
+    return n_aux_qubit, program
+
+
+def convolve(quantumImage: QuantumImage, kernel: np.ndarray) -> None:
+    """Apply a correlation kernel to an encoded image.
+
+    The translations are the "increment" ones of traslate_circuit, coherent and without
+    ancillas, so the terms of the combination interfere. The filtered image is the part of
+    the state with the auxiliary qubits in zero, see compile_kernel.
+
+    Args:
+        quantumImage (QuantumImage): Encoded quantum image.
+        kernel (np.ndarray): Real two dimensional kernel.
+
+    Returns: None
+    """
+    n_aux_qubit, program = compile_kernel(kernel)
+    add_filter_qubits(quantumImage, n_aux_qubit, adder=False)
+    ops = OpList(quantumImage.circuit.num_qubits)
+    run_program(quantumImage, program, ops, "increment")
+    ops.materialise(quantumImage.circuit)
@@ -1,17 +1,21 @@
 """Encodings File."""
+import typing
+
 import numpy as np
-import qiskit
+from qiskit.circuit import ParameterExpression
 from qiskit.circuit.library.standard_gates import RYGate
-from tqdm import tqdm
 
+from qimp.Instrumentation.Metrics import stage
+
+from .Operations import OpList, Target
 from .QuantumImage import QuantumImage
 
 
-def hadamard(circ: qiskit.QuantumCircuit, n: list) -> None:
+def hadamard(circ: Target, n: list) -> None:
     """Hadamard gate applied to n wires.
 
     Args:
-        circ (qiskit.QuantumCircuit): Target circuit.
+        circ (Target): Target circuit or gate list.
         n (list): List of target Wires.
 
     Returns: None
@@ -21,217 +25,535 @@ def hadamard(circ: qiskit.QuantumCircuit, n: list) -> None:
         circ.h(i)
 
 
-def xyfrqi(quantumimage: QuantumImage) -> None:
+def gray_code(index: int) -> int:
+    """Binary reflected Gray code of an index.
+
+    Args:
+        index (int): Position in the Gray sequence.
+
+    Returns:
+        int: The Gray code word, consecutive words differ in exactly one bit.
+    """
+    return index ^ (index >> 1)
+
+
+def pixel_order(required_qubits: int, traversal: str = "row") -> typing.List[int]:
+    """Order in which the pixel positions are visited by the encoders.
+
+    A position packs the column in the low ``required_qubits / 2`` bits and the row in the
+    high ones, so bit ``k`` of a position is the address qubit ``k``.
+
+    Args:
+        required_qubits (int): Number of address qubits.
+        traversal (str): "row" for row-major order, "gray" for Gray-code order, where two
+            consecutive positions differ on exactly one address qubit.
+
+    Returns:
+        list: Positions in visiting order.
+
+    Raises:
+        Exception: If the traversal is not supported.
+    """
+    if traversal == "row":
+        return list(range(pow(2, required_qubits)))
+    if traversal == "gray":
+        return [gray_code(index) for index in range(pow(2, required_qubits))]
+    raise Exception("Unknown traversal " + str(traversal))
+
+
+def select_pixels(
+    order: typing.List[int], image: np.ndarray, threshold: float
+) -> typing.List[int]:
+    """Keep only the positions whose pixel is brighter than threshold.
+
+    Args:
+        order (list): Positions in visiting order.
+        image (np.ndarray): Padded image.
+        threshold (float): Pixels less than or equal to this value are dropped.
+
+    Returns:
+        list: The remaining positions, in the same order.
+    """
+    positions = np.asarray(order, dtype=int)
+    return typing.cast(
+        typing.List[int], positions[image.reshape(-1)[positions] > threshold].tolist()
+    )
+
+
+def toggle_address(circ: Target, mask: int, offset: int) -> None:
+    """Apply an X gate on every address qubit whose bit is set in mask.
+
+    Args:
+        circ (Target): Target circuit or gate list.
+        mask (int): Bit mask of the address qubits to flip.
+        offset (int): Index of the first address qubit.
+
+    Returns: None
+    """
+    tonegate = []
+    index = 0
+    while mask:
+        if mask & 1:
+            tonegate.append(offset + index)
+        mask >>= 1
+        index += 1
+    if tonegate:
+        circ.x(tonegate)
+
+
+def mcry_walk(
+    circ: Target,
+    angles: typing.Union[typing.Sequence, np.ndarray],
+    order: typing.List[int],
+    offset: int,
+    required_qubits: int,
+    verbose: bool = False,
+    final: typing.Optional[int] = None,
+    start: int = 0,
+) -> None:
+    """Load pixel angles with one rotation controlled on all the address qubits per pixel.
+
+    Args:
+        circ (Target): Target circuit or gate list.
+        angles (typing.Sequence): Angle of every position from start, numbers or parameters.
+        order (list): Positions to load, in visiting order.
+        offset (int): Index of the first address qubit, the colour qubit follows them.
+        required_qubits (int): Number of address qubits.
+        verbose (bool): Show a progress bar.
+        final (int): Address flips left at the end, all of them by default.
+        start (int): Position of the first angle.
+
+    Returns: None
+    """
+    from tqdm import tqdm
+
+    n = list(range(offset, offset + required_qubits))
+    t = offset + required_qubits
+    aux = n + [t]
+    mask = 0
+    for position in tqdm(order, disable=not verbose):
+        toggle_address(circ, mask ^ position, offset)
+        mask = position
+
+        angle = angles[position - start]
+        if isinstance(angle, ParameterExpression):
+            # qiskit synthesises controlled rotations from their matrix, which needs a bound
+            # angle, so use the RY(a) X RY(-a) X identity around a multi-controlled X instead
+            circ.ry(angle, t)
+            circ.mcx(n, t)
+            circ.ry(-angle, t)
+            circ.mcx(n, t)
+        else:
+            cry = RYGate(2 * angle).control(required_qubits)
+            circ.append(cry, aux)
+        # circ.barrier()
+    # leave the address register flipped as the row-major walk does
+    if final is None:
+        final = pow(2, required_qubits) - 1
+    toggle_address(circ, mask ^ final, offset)
+
+
+def xyfrqi(
+    quantumimage: QuantumImage,
+    traversal: str = "row",
+    sparse: bool = False,
+    threshold: float = 0.0,
+    circ: typing.Optional[Target] = None,
+) -> None:
     """FRQI encoding with xy variant.
 
+    Every pixel is loaded by a rotation controlled on all the address qubits. The address
+    qubits are flipped between two pixels so that the control matches the next position,
+    the flips are the XOR of the two positions.
+
     Args:
         quantumimage (QuantumImage): Target Image.
+        traversal (str): Pixel visiting order, "row" or "gray".
+        sparse (bool): Skip the pixels that are not brighter than threshold, the address
+            flips between the remaining pixels are merged.
+        threshold (float): Brightness threshold of the sparse mode.
+        circ (Target): Where to write the gates, the circuit of the image by default.
+
+
+    Returns: None
+
+    """
+    order = pixel_order(quantumimage.required_qubits, traversal)
+    if sparse:
+        order = select_pixels(order, quantumimage.image, threshold)
+    mcry_walk(
+        quantumimage.circuit if circ is None else circ,
+        quantumimage.angles.reshape(-1),
+        order,
+        quantumimage.n_aux_qubit,
+        quantumimage.required_qubits,
+        quantumimage.verbose,
+    )
+
+
+def walsh_hadamard(values: np.ndarray) -> np.ndarray:
+    """Fast Walsh-Hadamard transform, without normalisation.
+
+    Args:
+        values (np.ndarray): Vector whose length is a power of two.
+
+    Returns:
+        np.ndarray: Entry ``i`` is the sum of ``(-1)^popcount(i & j) * values[j]``.
+    """
+    transformed = np.array(values, dtype=float).reshape(-1)
+    length = len(transformed)
+    half = 1
+    while half < length:
+        blocks = transformed.reshape(-1, 2, half)
+        transformed = np.concatenate(
+            (blocks[:, 0] + blocks[:, 1], blocks[:, 0] - blocks[:, 1]), axis=1
+        ).reshape(-1)
+        half *= 2
+    return transformed
+
+
+def ucry(circ: Target, angles: np.ndarray, controls: list, target: int) -> None:
+    """Uniformly controlled RY rotation.
+
+    Rotates the target by ``angles[j]`` when the controls are in the basis state ``j``,
+    ``controls[0]`` being the least significant bit. The rotation is decomposed in
+    ``2^len(controls)`` RY gates and as many CNOTs: the RY angles come from a Walsh-Hadamard
+    transform of angles and the CNOT controls follow a Gray code.
+
+    Args:
+        circ (Target): Target circuit or gate list.
+        angles (np.ndarray): One rotation angle per basis state of the controls.
+        controls (list): Control wires.
+        target (int): Target wire.
+
+    Returns: None
+    """
+    ucry_ladder(circ, ucry_coefficients(angles), controls, target)
 
 
+def ucry_coefficients(angles: np.ndarray) -> np.ndarray:
+    """Angles of the RY gates of a uniformly controlled rotation.
+
+    Args:
+        angles (np.ndarray): One rotation angle per basis state of the controls.
+
+    Returns:
+        np.ndarray: The Walsh-Hadamard transform of angles, in Gray code order.
+    """
+    angles = np.asarray(angles, dtype=float).reshape(-1)
+    coefficients = walsh_hadamard(angles)[[gray_code(k) for k in range(len(angles))]]
+    return coefficients / len(angles)
+
+
+def ucry_ladder(
+    circ: Target,
+    coefficients: typing.Union[typing.Sequence, np.ndarray],
+    controls: list,
+    target: int,
+) -> None:
+    """Alternate RY gates and CNOTs whose controls follow a Gray code.
+
+    Args:
+        circ (Target): Target circuit or gate list.
+        coefficients (typing.Sequence): Angles of the RY gates, as given by
+            ucry_coefficients, numbers or parameters. Zero angles are skipped.
+        controls (list): Control wires.
+        target (int): Target wire.
+
     Returns: None
+    """
+    n = len(controls)
+    for k, theta in enumerate(coefficients):
+        if isinstance(theta, ParameterExpression) or not np.isclose(theta, 0.0):
+            circ.ry(theta, target)
+        if n > 0:
+            # the next Gray code word differs on the lowest set bit of k + 1
+            control = min(((k + 1) & -(k + 1)).bit_length() - 1, n - 1)
+            circ.cx(controls[control], target)
+
+
+def ucfrqi(quantumimage: QuantumImage, circ: typing.Optional[Target] = None) -> None:
+    """FRQI encoding with a single uniformly controlled rotation.
+
+    Args:
+        quantumimage (QuantumImage): Target Image.
+        circ (Target): Where to write the gates, the circuit of the image by default.
 
+    Returns: None
     """
-    n = [
-        int(x)
-        for x in range(
+    controls = list(
+        range(
             quantumimage.n_aux_qubit,
-            quantumimage.total_qubits + quantumimage.n_aux_qubit - 1,
+            quantumimage.n_aux_qubit + quantumimage.required_qubits,
         )
-    ]
-    t = int(quantumimage.total_qubits + quantumimage.n_aux_qubit - 1)
-    bitsneeded = "{0:0" + str(int(quantumimage.required_qubits / 2)) + "b}"
-    print(bitsneeded)
-    nqubits: int = quantumimage.circuit.num_qubits
-    print("TOTQUB: " + str(nqubits))
-    print("requiredqubits:" + str(quantumimage.required_qubits))
-    y_old = ""
-    for index_row, rows in enumerate(tqdm(quantumimage.angles)):
-        x_old = bitsneeded.format(index_row - 1)[::-1]
-        if index_row == 0:
-            changed = False
-        else:
-            changed = True
-
-        for index_cols, i in enumerate(rows):  # i: np.ndarray
-            y = bitsneeded.format(index_cols)
-
-            if index_row + index_cols > 0:
-                if changed:
-                    changed = False
-                    x = bitsneeded.format(index_row)
-                    tonegatex = []
-                    for index, element in enumerate(x[::-1]):
-                        if element != x_old[index]:
-                            # print("adding 1")
-                            # print(nqubits+index-required_qubits/2-1)
-                            tonegatex.append(
-                                int(
-                                    nqubits
-                                    + index
-                                    - quantumimage.required_qubits / 2
-                                    - 1
-                                    - quantumimage.n_aux_qubit
-                                )
-                            )
-                            # print("tonegatx:"+str(int(nqubits+index-required_qubits/2-1-n_aux_qubit)))
-
-                    quantumimage.circuit.x(np.abs(tonegatex) + quantumimage.n_aux_qubit)
-                tonegatey = []
-                for index, element in enumerate(y[::-1]):
-                    if element != y_old[index]:
-                        tonegatey.append(
-                            int(
-                                nqubits
-                                + index
-                                - quantumimage.required_qubits
-                                - 1
-                                - quantumimage.n_aux_qubit
-                            )
-                        )
-                        # print("tonegaty:"+str(int(nqubits+index-required_qubits-1-n_aux_qubit)))
-
-                quantumimage.circuit.x(np.abs(tonegatey) + quantumimage.n_aux_qubit)
-            y_old = bitsneeded.format(index_cols)[::-1]
-
-            controls = len(n)
-            cry = RYGate(2 * i).control(controls)
-            aux = np.append(n, t).tolist()
-            quantumimage.circuit.append(cry, aux)
-            # circ.barrier()
-
-
-def FRQI(quantumImage: QuantumImage) -> None:
+    )
+    target = quantumimage.n_aux_qubit + quantumimage.required_qubits
+    ucry(quantumimage.circuit if circ is None else circ, 2 * quantumimage.angles, controls, target)
+
+
+def FRQI(
+    quantumImage: QuantumImage,
+    traversal: str = "row",
+    method: str = "mcry",
+    sparse: bool = False,
+    threshold: float = 0.0,
+) -> None:
     """
     FRQI encoding for a quantum image.
 
     Args:
         quantumImage (QuantumImage): Target Image.
+        traversal (str): Pixel visiting order, "row" or "gray".
+        method (str): "mcry" loads every pixel with its own multi-controlled rotation,
+            "ucry" loads the whole image with one uniformly controlled rotation and does not
+            depend on the traversal.
+        sparse (bool): Only load the pixels brighter than threshold, the others are encoded
+            as black.
+        threshold (float): Brightness threshold of the sparse mode.
 
     Returns: None
 
     Raises:
-        Exception: If the image has already been encoded."""
+        Exception: If the image has already been encoded or the method is unknown."""
+
+    if method not in ("mcry", "ucry"):
+        raise Exception("Unknown FRQI method " + str(method))
 
     if quantumImage.encoding == "":
         quantumImage.total_qubits = int(quantumImage.required_qubits + 1)
         quantumImage.compute_angles()
+        if sparse:
+            quantumImage.angles[quantumImage.image <= threshold] = 0.0
         quantumImage.init_circuit(1)
         quantumImage.encoding = "FRQI"
     else:
         raise Exception("The image has allready been encoded")
 
-    hadamard(quantumImage.circuit, [x for x in range(quantumImage.total_qubits - 1)])
-    xyfrqi(quantumImage)  # 1
+    with stage(quantumImage.metrics, "encoding", lambda: quantumImage.circuit):
+        ops = OpList(quantumImage.circuit.num_qubits)
+        hadamard(ops, [x for x in range(quantumImage.total_qubits - 1)])
+        if method == "ucry":
+            ucfrqi(quantumImage, ops)
+        else:
+            xyfrqi(quantumImage, traversal, sparse, threshold, ops)  # 1
+        ops.materialise(quantumImage.circuit)
 
 
-def binarization(image: np.ndarray) -> np.chararray:
+def binarization(image: np.ndarray) -> np.ndarray:
     """Binarization of a grayscale image.
 
     Args:
         image (np.ndarray): Grayscale Image.
 
     Returns:
-        list: Binary values of the pixels of the image.
+        np.ndarray: Bit planes of the image with shape (H, W, 8), the most significant bit
+            first.
     """
-    binarizedangles = np.chararray((image.shape[0], image.shape[1]), itemsize=8)
+    return np.unpackbits(np.asarray(image).astype(np.uint8)[..., np.newaxis], axis=-1)
 
-    for i in range(image.shape[0]):
-        for j in range(image.shape[1]):
-            binarizedangles[i][j] = np.binary_repr(int(image[i][j]), width=8)
 
-    return binarizedangles
+def merge_cubes(minterms: typing.Iterable[int], n: int) -> typing.List[typing.Tuple[int, int]]:
+    """Cover a set of positions with disjoint cubes.
 
+    A cube is a pair ``(mask, value)``: it contains the positions that agree with value on
+    the bits set in mask, the other bits are don't-care. Pairs of cubes that differ on a
+    single cared bit are merged until no merge is left, so aligned blocks of positions
+    collapse into one cube. The cubes never overlap, hence their XOR equals their union.
 
-def NEQR(quantumimage: QuantumImage) -> None:
+    Args:
+        minterms (typing.Iterable[int]): Positions where the function is one.
+        n (int): Number of bits of a position.
+
+    Returns:
+        list: The cubes as (mask, value) pairs.
+    """
+    cubes: typing.Dict[int, typing.Set[int]] = {pow(2, n) - 1: set(int(m) for m in minterms)}
+    changed = True
+    while changed:
+        changed = False
+        for mask in sorted(cubes, reverse=True):
+            values = cubes[mask]
+            for bit in range(n):
+                flag = 1 << bit
+                if not mask & flag:
+                    continue
+                pairs = [v for v in values if not v & flag and v | flag in values]
+                if not pairs:
+                    continue
+                merged = cubes.setdefault(mask & ~flag, set())
+                for v in pairs:
+                    values.discard(v)
+                    values.discard(v | flag)
+                    merged.add(v)
+                changed = True
+    return [(mask, value) for mask in cubes for value in cubes[mask]]
+
+
+def esopneqr(
+    quantumimage: QuantumImage, bitplanes: np.ndarray, circ: typing.Optional[Target] = None
+) -> None:
+    """NEQR encoding of every bit plane as a minimised Boolean function of the position.
+
+    Each cube of a bit plane becomes one multi-controlled X whose controls are only the
+    address qubits the cube cares about. The address qubits are flipped so that the
+    controls match the cube value, the flips are shared between consecutive cubes.
+
+    Args:
+        quantumimage (QuantumImage): Target Image.
+        bitplanes (np.ndarray): Bit planes of the image, as returned by binarization.
+        circ (Target): Where to write the gates, the circuit of the image by default.
+
+    Returns: None
+    """
+    if circ is None:
+        circ = quantumimage.circuit
+    n = quantumimage.required_qubits
+    full = pow(2, n) - 1
+    bitplanes = bitplanes.reshape(-1, 8)
+    gates = []
+    for index in range(8):
+        for mask, value in merge_cubes(np.flatnonzero(bitplanes[:, index]), n):
+            gates.append((~value & mask, mask, index))
+    # gates with the same flip pattern are emitted next to each other
+    gates.sort()
+
+    flipped = 0
+    for pattern, mask, index in gates:
+        toggle_address(circ, (flipped ^ pattern) & mask, quantumimage.n_aux_qubit)
+        flipped ^= (flipped ^ pattern) & mask
+        target = quantumimage.n_aux_qubit + n + index
+        controls = [quantumimage.n_aux_qubit + bit for bit in range(n) if mask & (1 << bit)]
+        if controls:
+            circ.mcx(controls, target)
+        else:
+            circ.x(target)
+    toggle_address(circ, flipped & full, quantumimage.n_aux_qubit)
+
+
+def mcx_walk(
+    circ: Target,
+    bitplanes: np.ndarray,
+    order: typing.List[int],
+    offset: int,
+    required_qubits: int,
+    barriers: bool = False,
+    verbose: bool = False,
+    final: typing.Optional[int] = None,
+    start: int = 0,
+) -> None:
+    """Load pixel bits with one multi-controlled X per set bit of every pixel.
+
+    Args:
+        circ (Target): Target circuit or gate list.
+        bitplanes (np.ndarray): Bits of every position from start, one row per position.
+        order (list): Positions to load, in visiting order.
+        offset (int): Index of the first address qubit, the colour qubits follow them.
+        required_qubits (int): Number of address qubits.
+        barriers (bool): Add a barrier after the last pixel of every row.
+        verbose (bool): Show a progress bar.
+        final (int): Address flips left at the end, all of them by default.
+        start (int): Position of the first row of bits.
+
+    Returns: None
+    """
+    from tqdm import tqdm
+
+    side = pow(2, int(required_qubits / 2))
+    controls = list(range(offset, offset + required_qubits))
+    mask = 0
+    for position in tqdm(order, disable=not verbose):
+        toggle_address(circ, mask ^ position, offset)
+        mask = position
+
+        for index in np.flatnonzero(bitplanes[position - start]):
+            circ.mcx(controls, required_qubits + offset + int(index))
+        if barriers and position % side == side - 1:
+            circ.barrier()
+    if final is None:
+        final = side * side - 1
+    toggle_address(circ, mask ^ final, offset)
+
+
+def xyneqr(
+    quantumimage: QuantumImage,
+    bitplanes: np.ndarray,
+    traversal: str = "row",
+    sparse: bool = False,
+    threshold: float = 0.0,
+    circ: typing.Optional[Target] = None,
+) -> None:
+    """NEQR encoding of every pixel with one multi-controlled X per set bit.
+
+    The address qubits are flipped between two pixels as in xyfrqi.
+
+    Args:
+        quantumimage (QuantumImage): Target Image.
+        bitplanes (np.ndarray): Bit planes of the image, as returned by binarization.
+        traversal (str): Pixel visiting order, "row" or "gray".
+        sparse (bool): Skip the pixels that are not brighter than threshold.
+        threshold (float): Brightness threshold of the sparse mode.
+        circ (Target): Where to write the gates, the circuit of the image by default.
+
+    Returns: None
+    """
+    order = pixel_order(quantumimage.required_qubits, traversal)
+    if sparse:
+        order = select_pixels(order, quantumimage.image, threshold)
+    mcx_walk(
+        quantumimage.circuit if circ is None else circ,
+        bitplanes.reshape(-1, 8),
+        order,
+        quantumimage.n_aux_qubit,
+        quantumimage.required_qubits,
+        traversal == "row" and not sparse,
+        quantumimage.verbose,
+    )
+
+
+def NEQR(
+    quantumimage: QuantumImage,
+    traversal: str = "row",
+    sparse: bool = False,
+    threshold: float = 0.0,
+    method: str = "mcx",
+) -> None:
     """
     NEQR encoding for a quantum image.
 
     Args:
         quantumimage (QuantumImage): Target Image.
+        traversal (str): Pixel visiting order, "row" or "gray".
+        sparse (bool): Only load the pixels brighter than threshold, the others are encoded
+            as black. The address flips between the remaining pixels are merged and no
+            barriers are added.
+        threshold (float): Brightness threshold of the sparse mode.
+        method (str): "mcx" emits one multi-controlled X per set bit of every pixel,
+            "esop" minimises every bit plane and emits one multi-controlled X per cube; it
+            does not depend on the traversal.
 
     Returns: None
 
     Raises:
-        Exception: If the image has already been encoded."""
+        Exception: If the image has already been encoded or the method is unknown."""
+
+    if method not in ("mcx", "esop"):
+        raise Exception("Unknown NEQR method " + str(method))
 
     if quantumimage.encoding == "":
         quantumimage.total_qubits = int(quantumimage.required_qubits + 8)
-        binarizedangles = binarization(quantumimage.image)
-        print(binarizedangles)
+        bitplanes = binarization(quantumimage.image)
         quantumimage.init_circuit(8)
         quantumimage.encoding = "NEQR"
     else:
         raise Exception("The image has allready been encoded")
 
-    hadamard(quantumimage.circuit, [x for x in range(quantumimage.required_qubits)])
-    bitsneeded = "{0:0" + str(int(quantumimage.required_qubits / 2)) + "b}"
-
-    nqubits: int = quantumimage.circuit.num_qubits
-
-    y_old = ""
-    for index_row, rows in enumerate(tqdm(binarizedangles)):
-        x_old = bitsneeded.format(index_row - 1)[::-1]
-        if index_row == 0:
-            changed = False
+    with stage(quantumimage.metrics, "encoding", lambda: quantumimage.circuit):
+        ops = OpList(quantumimage.circuit.num_qubits)
+        hadamard(ops, [x for x in range(quantumimage.required_qubits)])
+        if method == "esop":
+            if sparse:
+                bitplanes[quantumimage.image <= threshold] = 0
+            esopneqr(quantumimage, bitplanes, ops)
         else:
-            changed = True
-
-        for index_cols, i in enumerate(rows):  # i: np.ndarray
-            y = bitsneeded.format(index_cols)
-
-            if index_row + index_cols > 0:
-                if changed:
-                    changed = False
-                    x = bitsneeded.format(index_row)
-                    tonegatex = []
-                    for index, element in enumerate(x[::-1]):
-                        if element != x_old[index]:
-                            # print("adding 1")
-                            # print(nqubits+index-required_qubits/2-1)
-                            tonegatex.append(
-                                int(
-                                    nqubits
-                                    + index
-                                    - quantumimage.required_qubits / 2
-                                    - 8
-                                    - quantumimage.n_aux_qubit
-                                )
-                            )
-                            # print("tonegatx:"+str(int(nqubits+index-required_qubits/2-1-n_aux_qubit)))
-
-                    quantumimage.circuit.x(np.abs(tonegatex) + quantumimage.n_aux_qubit)
-                tonegatey = []
-                for index, element in enumerate(y[::-1]):
-                    if element != y_old[index]:
-                        tonegatey.append(
-                            int(
-                                nqubits
-                                + index
-                                - quantumimage.required_qubits
-                                - 8
-                                - quantumimage.n_aux_qubit
-                            )
-                        )
-                        # print("tonegaty:"+str(int(nqubits+index-required_qubits-1-n_aux_qubit)))
-
-                quantumimage.circuit.x(np.abs(tonegatey) + quantumimage.n_aux_qubit)
-
-                print("printing i:", i)
-                for index, element in enumerate(list(str(i))):
-                    if element != "b" and element != "'":
-                        print("printing element:", element)
-                        if element == "1":
-                            quantumimage.circuit.mcx(
-                                list(
-                                    range(
-                                        quantumimage.n_aux_qubit,
-                                        quantumimage.n_aux_qubit + quantumimage.required_qubits,
-                                    )
-                                ),
-                                quantumimage.required_qubits
-                                + quantumimage.n_aux_qubit
-                                + index
-                                - 2,
-                            )
-            y_old = bitsneeded.format(index_cols)[::-1]
-        quantumimage.circuit.barrier()
+            xyneqr(quantumimage, bitplanes, traversal, sparse, threshold, ops)
+        ops.materialise(quantumimage.circuit)
@@ -0,0 +1,161 @@
+"""Gate lists built before the qiskit circuit, with peephole cancellation."""
+import typing
+
+from qiskit import QuantumCircuit
+
+# gates equal to their inverse, two adjacent copies on the same qubits cancel out
+SELF_INVERSE = ("x", "cx", "h")
+
+
+class OpList(object):
+    """Gates waiting to be added to a circuit.
+
+    It records the calls of the QuantumCircuit methods used by the encoders and filters.
+    Two adjacent copies of a self-inverse gate, with nothing on their qubits in between,
+    cancel out as soon as the second one is added, and a barrier following another one
+    with no gate in between is dropped. The circuit is written once by materialise.
+    """
+
+    __slots__ = (
+        "num_qubits",
+        "ops",
+        "stacks",
+        "last_barrier",
+        "after_barrier",
+        "cancelled",
+        "barriers",
+    )
+
+    def __init__(self, num_qubits: int) -> None:
+        """
+        Returns an empty list of gates.
+
+        Args:
+            num_qubits (int): Number of qubits of the target circuit.
+
+        Returns: None
+        """
+        self.num_qubits = num_qubits
+        self.ops: typing.List[typing.Optional[typing.Tuple[str, tuple, tuple]]] = []
+        # indices of the live gates acting on every qubit, the last one on top
+        self.stacks: typing.List[typing.List[int]] = [[] for _ in range(num_qubits)]
+        self.last_barrier = -1
+        self.after_barrier = 0
+        self.cancelled = 0
+        self.barriers = 0
+
+    def __len__(self) -> int:
+        """Number of live gates."""
+        return len(self.ops) - self.cancelled
+
+    def size(self) -> int:
+        """Number of live gates, the barriers excluded as in QuantumCircuit.size."""
+        return len(self) - self.barriers
+
+    def add(self, name: str, qubits: typing.Sequence[int], *args: typing.Any) -> None:
+        """Add a gate, cancelling it with the previous one on its qubits if possible.
+
+        Args:
+            name (str): Name of the QuantumCircuit method adding the gate.
+            qubits (list): Qubits of the gate, all of them for a barrier.
+            args (typing.Any): Arguments of the method, the qubits excluded.
+
+        Returns: None
+        """
+        qubits = tuple(qubits)
+        op = (name, qubits, args)
+        if name in SELF_INVERSE and self.stacks[qubits[0]]:
+            top = self.stacks[qubits[0]][-1]
+            if self.ops[top] == op and all(
+                self.stacks[qubit] and self.stacks[qubit][-1] == top for qubit in qubits
+            ):
+                self.ops[top] = None
+                for qubit in qubits:
+                    self.stacks[qubit].pop()
+                self.cancelled += 1
+                if top > self.last_barrier:
+                    self.after_barrier -= 1
+                return
+        if name == "barrier":
+            if self.last_barrier >= 0 and self.after_barrier == 0:
+                return
+            self.last_barrier = len(self.ops)
+            self.after_barrier = 0
+            self.barriers += 1
+        else:
+            self.after_barrier += 1
+        for qubit in qubits:
+            self.stacks[qubit].append(len(self.ops))
+        self.ops.append(op)
+
+    def extend(self, other: "OpList") -> None:
+        """Add the gates of another list, cancelling across the boundary.
+
+        Args:
+            other (OpList): Gates on the same qubits.
+
+        Returns: None
+        """
+        for op in other.ops:
+            if op is not None:
+                self.add(op[0], op[1], *op[2])
+
+    def h(self, qubit: int) -> None:
+        """Hadamard gate."""
+        self.add("h", [qubit])
+
+    def x(self, qubits: typing.Union[int, typing.List[int]]) -> None:
+        """X gate on one or more qubits."""
+        for qubit in qubits if isinstance(qubits, list) else [qubits]:
+            self.add("x", [qubit])
+
+    def cx(self, control: int, target: int) -> None:
+        """CNOT gate."""
+        self.add("cx", [control, target])
+
+    def ry(self, theta: typing.Any, qubit: int) -> None:
+        """RY rotation."""
+        self.add("ry", [qubit], theta)
+
+    def mcx(self, controls: typing.List[int], target: int) -> None:
+        """Multi-controlled X gate."""
+        self.add("mcx", list(controls) + [target])
+
+    def append(self, instruction: typing.Any, qubits: typing.List[int]) -> None:
+        """Any other instruction."""
+        self.add("append", qubits, instruction)
+
+    def reset(self, qubit: int) -> None:
+        """Reset of a qubit."""
+        self.add("reset", [qubit])
+
+    def barrier(self) -> None:
+        """Barrier on all the qubits."""
+        self.add("barrier", range(self.num_qubits))
+
+    def materialise(self, circuit: QuantumCircuit) -> QuantumCircuit:
+        """Append the live gates to a circuit, in order.
+
+        Args:
+            circuit (QuantumCircuit): Target circuit, with at least num_qubits qubits.
+
+        Returns:
+            QuantumCircuit: The circuit.
+        """
+        for op in self.ops:
+            if op is None:
+                continue
+            name, qubits, args = op
+            if name == "mcx":
+                circuit.mcx(list(qubits[:-1]), qubits[-1])
+            elif name == "append":
+                circuit.append(args[0], list(qubits))
+            elif name == "barrier":
+                circuit.barrier()
+            else:
+                getattr(circuit, name)(*args, *qubits)
+        return circuit
+
+
+# anything the encoders and filters can write their gates into
+Target = typing.Union[QuantumCircuit, OpList]
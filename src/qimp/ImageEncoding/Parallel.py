@@ -0,0 +1,151 @@
+"""Build the circuits of many images, or of one large image, on a pool of processes."""
+import concurrent.futures
+import os
+import typing
+
+import numpy as np
+
+from qimp.Instrumentation.Metrics import stage
+
+from .Encodings import FRQI, NEQR, binarization, hadamard, mcry_walk, mcx_walk, toggle_address
+from .Operations import OpList
+from .QuantumImage import QuantumImage
+
+ENCODERS: typing.Dict[str, typing.Callable[..., None]] = {"FRQI": FRQI, "NEQR": NEQR}
+
+# colour qubits of the encodings built row range by row range
+COLOR_QUBITS = {"FRQI": 1, "NEQR": 8}
+
+
+def _encode(
+    image: np.ndarray, encoding: str, method: str, sobel: bool, zooming_factor: float
+) -> QuantumImage:
+    """Build the circuit of one image, run in a worker process."""
+    quantumimage = QuantumImage(image, zooming_factor)
+    if method:
+        ENCODERS[encoding](quantumimage, method=method)
+    else:
+        ENCODERS[encoding](quantumimage)
+    if sobel:
+        from qimp.Filters.Filters import sobel as sobel_filter
+
+        sobel_filter(quantumimage)
+    return quantumimage
+
+
+def encode_images(
+    images: typing.Sequence[np.ndarray],
+    encoding: str = "FRQI",
+    method: str = "",
+    sobel: bool = False,
+    zooming_factor: float = 1.0,
+    workers: typing.Optional[int] = None,
+) -> typing.List[QuantumImage]:
+    """Encode many images in parallel, one image per task.
+
+    Args:
+        images (list): Images to encode.
+        encoding (str): "FRQI" or "NEQR".
+        method (str): Construction method of the encoding, its default if empty.
+        sobel (bool): Also apply the Sobel filter to every image.
+        zooming_factor (float): Zooming factor applied to every image.
+        workers (int): Number of processes, all the cores by default.
+
+    Returns:
+        list: The encoded quantum images, in the order of images.
+
+    Raises:
+        Exception: If the encoding is unknown.
+    """
+    if encoding not in ENCODERS:
+        raise Exception("Unknown encoding " + str(encoding))
+    count = len(images)
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(
+            executor.map(
+                _encode,
+                images,
+                [encoding] * count,
+                [method] * count,
+                [sobel] * count,
+                [zooming_factor] * count,
+            )
+        )
+
+
+def _walk_rows(encoding: str, values: np.ndarray, start: int, required_qubits: int) -> OpList:
+    """Build the pixels of a range of rows, starting and ending with no address flips.
+
+    Args:
+        encoding (str): "FRQI" or "NEQR".
+        values (np.ndarray): Angles or bits of the pixels of the range, one row per position.
+        start (int): First position of the range.
+        required_qubits (int): Number of address qubits.
+
+    Returns:
+        OpList: The gates of the pixels of the range, on the address and colour qubits.
+    """
+    circuit = OpList(required_qubits + COLOR_QUBITS[encoding])
+    order = list(range(start, start + len(values)))
+    if encoding == "FRQI":
+        mcry_walk(circuit, values, order, 0, required_qubits, final=0, start=start)
+    else:
+        mcx_walk(circuit, values, order, 0, required_qubits, barriers=True, final=0, start=start)
+    return circuit
+
+
+def encode_rows(
+    quantumimage: QuantumImage,
+    encoding: str = "FRQI",
+    chunks: int = 0,
+    workers: typing.Optional[int] = None,
+) -> None:
+    """Encode one large image, building disjoint ranges of rows in parallel.
+
+    Every range is walked as by the "mcry" FRQI or "mcx" NEQR methods with row-major
+    traversal, but starts and ends with no address flips, so the ranges are merged by
+    appending them in order. The flips at the boundaries cancel out while merging, and the
+    circuit is the one of the sequential encoders.
+
+    Args:
+        quantumimage (QuantumImage): Target Image.
+        encoding (str): "FRQI" or "NEQR".
+        chunks (int): Number of row ranges, the number of workers by default.
+        workers (int): Number of processes, all the cores by default.
+
+    Returns: None
+
+    Raises:
+        Exception: If the encoding is unknown or the image has already been encoded.
+    """
+    if encoding not in COLOR_QUBITS:
+        raise Exception("Unknown encoding " + str(encoding))
+    if quantumimage.encoding != "":
+        raise Exception("The image has allready been encoded")
+
+    n = quantumimage.required_qubits
+    quantumimage.total_qubits = int(n + COLOR_QUBITS[encoding])
+    if encoding == "FRQI":
+        quantumimage.compute_angles()
+        values = quantumimage.angles.reshape(-1)
+    else:
+        values = binarization(quantumimage.image).reshape(-1, 8)
+    quantumimage.init_circuit(COLOR_QUBITS[encoding])
+    quantumimage.encoding = encoding
+
+    side = pow(2, int(n / 2))
+    chunks = min(chunks or workers or os.cpu_count() or 1, side)
+    bounds = [side * (row * side // chunks) for row in range(chunks + 1)]
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+        with stage(quantumimage.metrics, "encoding", lambda: quantumimage.circuit):
+            futures = [
+                executor.submit(_walk_rows, encoding, values[start:stop], start, n)
+                for start, stop in zip(bounds[:-1], bounds[1:])
+            ]
+            ops = OpList(quantumimage.total_qubits)
+            hadamard(ops, list(range(n)))
+            for future in futures:
+                ops.extend(future.result())
+            # leave the address register flipped as the sequential walks do
+            toggle_address(ops, pow(2, n) - 1, 0)
+            ops.materialise(quantumimage.circuit)
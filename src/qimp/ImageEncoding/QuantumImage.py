@@ -2,13 +2,40 @@
 import math
 import typing
 
-import matplotlib.pyplot as plt
 import numpy
 import numpy as np
 from qiskit import ClassicalRegister, QuantumCircuit, QuantumRegister
 from qiskit.result import Result
-from scipy.ndimage import zoom
-from tqdm import tqdm
+
+from qimp.Instrumentation.Metrics import Metrics, stage
+
+
+def __getattr__(name: str) -> typing.Any:
+    """Import the plotting backend on first use.
+
+    Args:
+        name (str): Name of the module attribute.
+
+    Returns:
+        typing.Any: The matplotlib.pyplot module for ``plt``.
+
+    Raises:
+        AttributeError: If the attribute does not exist.
+    """
+    if name == "plt":
+        import matplotlib.pyplot
+
+        return matplotlib.pyplot
+    raise AttributeError("module " + repr(__name__) + " has no attribute " + repr(name))
+
+
+# NEQR stores the most significant bit of a pixel on the first colour qubit, so the colour
+# register holds the pixel with its bits reversed
+REVERSED_BYTES = np.packbits(
+    np.unpackbits(np.arange(256, dtype=np.uint8)[:, np.newaxis], axis=-1),
+    axis=-1,
+    bitorder="little",
+).reshape(-1)
 
 
 def generate_example_image(side: int = 8) -> numpy.ndarray:
@@ -43,32 +70,46 @@ def generate_example_image(side: int = 8) -> numpy.ndarray:
 class QuantumImage(object):
     """General class to implement represent a classical image in Qiskit."""
 
-    angles: numpy.ndarray = np.empty([1, 1])
-    circuit = QuantumCircuit(1)
-    x_qubits = QuantumRegister(1)
-    y_qubits = QuantumRegister(1)
-    color_qubit = QuantumRegister(1)
-    total_qubits: int = 0
-    initial_qubits: int = 0
-    x_wires: typing.List[int] = []
-    y_wires: typing.List[int] = []
-    c_wire: typing.List[int] = []
-    pos_wires: typing.List[int] = []
-    total_wires: typing.List[int] = []
-    n_aux_qubit: int = 0
-    encoding: str = ""
-    num_carry: int = 0
-    num_summing: int = 0
-    circuit = QuantumCircuit(1)
-    image: np.ndarray = np.empty([1, 1])
-
-    def __init__(self, image: numpy.ndarray, zooming_factor: float = 1.0) -> None:
+    # every attribute is owned by the instance, nothing is shared between images
+    __slots__ = (
+        "image",
+        "zooming_factor",
+        "required_qubits",
+        "angles",
+        "_circuit",
+        "x_qubits",
+        "y_qubits",
+        "color_qubit",
+        "total_qubits",
+        "initial_qubits",
+        "x_wires",
+        "y_wires",
+        "c_wire",
+        "pos_wires",
+        "total_wires",
+        "n_aux_qubit",
+        "encoding",
+        "num_carry",
+        "num_summing",
+        "metrics",
+        "verbose",
+    )
+
+    def __init__(
+        self,
+        image: numpy.ndarray,
+        zooming_factor: float = 1.0,
+        metrics: typing.Optional[Metrics] = None,
+        verbose: bool = False,
+    ) -> None:
         """
         Returns an object Quantum Image.
 
         Arguments:
             image (numpy.ndarray): Input image to be transformed
             zooming_factor (float): Method required to encode the given image (default=FRQI)
+            metrics (Metrics): Records the time and resources of every stage, if given.
+            verbose (bool): Show progress bars while building the circuits.
 
         Returns: None
 
@@ -76,9 +117,26 @@ class QuantumImage(object):
             Exception: Wrong image format.
         """
 
+        self.metrics = metrics
+        self.verbose = verbose
+        self.angles = np.empty([1, 1])
+        self._circuit: typing.Optional[QuantumCircuit] = None
+        self.x_qubits: typing.Optional[QuantumRegister] = None
+        self.y_qubits: typing.Optional[QuantumRegister] = None
+        self.color_qubit: typing.Optional[QuantumRegister] = None
+        self.total_qubits = 0
+        self.initial_qubits = 0
+        self.x_wires: typing.List[int] = []
+        self.y_wires: typing.List[int] = []
+        self.c_wire: typing.List[int] = []
+        self.pos_wires: typing.List[int] = []
+        self.total_wires: typing.List[int] = []
+        self.n_aux_qubit = 0
+        self.encoding = ""
+        self.num_carry = 0
+        self.num_summing = 0
+
         if isinstance(image, np.ndarray):
-            print(type(image))
-            print(type(self.image))
             self.image = image
         else:
             raise Exception("Wrong Image type")
@@ -99,38 +157,92 @@ class QuantumImage(object):
         if (
             self.zooming_factor < 1.0 or self.zooming_factor > 1.0
         ):  # If the zooming factor is smaller than one then we apply the zoom
-            self.image = zoom(self.image, self.zooming_factor)
-            self.image = np.abs(self.image)
-            self.image[self.image > 255] = 255
+            with stage(self.metrics, "zoom"):
+                from scipy.ndimage import zoom
+
+                self.image = zoom(self.image, self.zooming_factor)
+                self.image = np.abs(self.image)
+                self.image[self.image > 255] = 255
 
-        # compute the padding dimensions for row and cols.
-        # works also for rectangular images
-        maxval = max(self.image.shape)
-        padding_target = pow(2, math.ceil(math.log2(maxval)))
+        with stage(self.metrics, "pad"):
+            # compute the padding dimensions for row and cols.
+            # works also for rectangular images
+            maxval = max(self.image.shape)
+            padding_target = pow(2, math.ceil(math.log2(maxval)))
 
-        xpad = padding_target - self.image.shape[0]
-        ypad = padding_target - self.image.shape[1]
+            xpad = padding_target - self.image.shape[0]
+            ypad = padding_target - self.image.shape[1]
 
-        xl = int(xpad / 2) + (1 if xpad % 2 == 1 else 0)
-        xr = int(xpad / 2)
-        yl = int(ypad / 2) + (1 if ypad % 2 == 1 else 0)
-        yr = int(ypad / 2)
+            xl = int(xpad / 2) + (1 if xpad % 2 == 1 else 0)
+            xr = int(xpad / 2)
+            yl = int(ypad / 2) + (1 if ypad % 2 == 1 else 0)
+            yr = int(ypad / 2)
 
-        self.image = np.pad(self.image, pad_width=((xr, xl), (yr, yl)))
+            self.image = np.pad(self.image, pad_width=((xr, xl), (yr, yl)))
 
         self.required_qubits = int(math.log2(np.shape(self.image)[0]) * 2)
         # Compute the number of required qubits to index rows and cols
 
+    @property
+    def circuit(self) -> QuantumCircuit:
+        """Circuit of the image, a single qubit placeholder is created on first use.
+
+        Returns:
+            QuantumCircuit: The circuit.
+        """
+        if self._circuit is None:
+            self._circuit = QuantumCircuit(1)
+        return self._circuit
+
+    @circuit.setter
+    def circuit(self, circuit: QuantumCircuit) -> None:
+        self._circuit = circuit
+
     def show_classical_image(self) -> None:
         """Show in a figure the original image, padded and eventually zoomed."""
+        import matplotlib.pyplot as plt
+
         plt.figure()
         plt.imshow(self.image, cmap="gray")
         plt.show()
 
     def compute_angles(self) -> None:
         """Transform the luminosity values of the image into angles to encode them."""
-        normalized_pixels = self.image / 255.0
-        self.angles = np.arcsin(normalized_pixels)
+        with stage(self.metrics, "angles"):
+            normalized_pixels = self.image / 255.0
+            self.angles = np.arcsin(normalized_pixels)
+
+    def statevector(self, encoding: str = "") -> np.ndarray:
+        """Exact state prepared by the encoding, computed without building or simulating it.
+
+        The amplitudes follow the ordering of the circuits: the address qubits come first,
+        the column in the low half and the row in the high half, then the colour qubits.
+
+        Args:
+            encoding (str): "FRQI" or "NEQR", defaults to the encoding of the image.
+
+        Returns:
+            np.ndarray: The statevector of the address and colour qubits.
+
+        Raises:
+            Exception: If the encoding is not supported.
+        """
+        encoding = encoding or self.encoding
+        positions = pow(2, self.required_qubits)
+        norm = np.sqrt(positions)
+        if encoding == "FRQI":
+            if self.encoding == "FRQI":
+                angles = self.angles.reshape(-1)
+            else:
+                angles = np.arcsin(self.image.reshape(-1) / 255.0)
+            state: np.ndarray = np.concatenate((np.cos(angles), np.sin(angles))) / norm
+            return state.astype(complex)
+        if encoding == "NEQR":
+            colors = REVERSED_BYTES[self.image.reshape(-1).astype(np.uint8)].astype(int)
+            state = np.zeros(positions * 256, dtype=complex)
+            state[np.arange(positions) + positions * colors] = 1.0 / norm
+            return state
+        raise Exception("Unknown encoding " + str(encoding))
 
     def init_circuit(self, colorqubits: int) -> None:
         """Initialize circuit for the image."""
@@ -151,6 +263,8 @@ class QuantumImage(object):
 
     def draw_circuit(self) -> None:  # pragma: no cover
         """Draws the circuit."""
+        import matplotlib.pyplot as plt
+
         plt.figure(1)
         self.circuit.draw(output="mpl")
         plt.show()
@@ -176,61 +290,155 @@ class QuantumImage(object):
         """
         self.circuit = self.circuit.reverse_bits()
 
-    def retrieve_and_show(self, result: Result, numOfShots: int) -> None:  # pragma: no cover
-        """Run experiments and show result, it requires measurements.
+    def save_probabilities(self, label: str = "probabilities") -> None:
+        """Save the exact probabilities of the encoding qubits when simulated with Aer.
+
+        The probabilities are computed in a single simulation, without measurements, and
+        can be passed to retrieve() through the Result.
 
         Args:
-            result (Result): where to store the results.
-            numOfShots (int): number of experiments to run.
+            label (str): Key of the saved probabilities in the result data.
 
         Returns: None
+        """
+        from qiskit_aer.library import SaveProbabilities
 
+        qubits = [x + self.n_aux_qubit for x in range(self.total_qubits)]
+        self.circuit.append(SaveProbabilities(len(qubits), label=label), qubits)
+
+    def probabilities(
+        self,
+        result: typing.Union[Result, typing.Dict[str, int], np.ndarray],
+        label: str = "probabilities",
+    ) -> np.ndarray:
+        """Dense probability vector of the encoding qubits.
+
+        A Result holding the probabilities saved by save_probabilities(), or a statevector
+        saved with the ``save_statevector`` instruction, is used as is. Otherwise the
+        counts are read and the classical bit k must hold the encoding qubit k, as done by
+        measure().
+
+        Args:
+            result (Result): Result of the execution of the circuit, its counts, or the
+                probabilities themselves.
+            label (str): Key of the saved probabilities in the result data.
+
+        Returns:
+            np.ndarray: Probability of every basis state of the address and colour qubits.
         """
-        retrieve_image_0 = np.zeros(
-            (
-                int(pow(2, self.required_qubits / 2)),
-                int(pow(2, self.required_qubits / 2)),
-            )
-        )
-        with tqdm(total=pow(2, self.n_aux_qubit) * pow(2, self.required_qubits)) as pbar:
-            for i in range(pow(2, self.n_aux_qubit) * pow(2, self.required_qubits)):
-                try:
-                    bitsneeded = "{0:0" + str(int(self.required_qubits) + self.n_aux_qubit) + "b}"
-                    s = bitsneeded.format(i)
-                    new_s = "1" + s
-                    extracted_value = np.sqrt(result.get_counts(self.circuit)[new_s] / numOfShots)
-                    y = s[: int(self.required_qubits / 2)]
-                    x = s[int(self.required_qubits / 2) : self.required_qubits]
-                    x_index = 0
-                    y_index = 0
-
-                    for index in range(int(self.required_qubits / 2)):
-                        if x[-index - 1] == "1":
-                            y_index += pow(2, index)
-                        if y[-index - 1] == "1":
-                            x_index += pow(2, index)
-
-                    retrieve_image_0[int(x_index)][int(y_index)] = extracted_value
-                    pbar.update(1)
-                except KeyError:
-                    pbar.update(1)
-                    pass
+        if isinstance(result, np.ndarray):
+            return result
+        if isinstance(result, Result):
+            data = result.data(self.circuit)
+            if label in data:
+                return np.asarray(data[label], dtype=float)
+            if "statevector" in data:
+                qubits = [x + self.n_aux_qubit for x in range(self.total_qubits)]
+                return np.asarray(data["statevector"].probabilities(qubits))
+        counts = result.get_counts(self.circuit) if isinstance(result, Result) else result
+        probabilities = np.zeros(pow(2, self.total_qubits))
+        indices = np.fromiter((int(key.replace(" ", ""), 2) for key in counts), dtype=np.int64)
+        probabilities[indices] = np.fromiter(counts.values(), dtype=float, count=len(indices))
+        probabilities /= probabilities.sum()
+        return probabilities
+
+    def decode(self, probabilities: np.ndarray) -> np.ndarray:
+        """Rebuild the image from the probabilities of the encoding qubits.
+
+        FRQI pixels are estimated from the probability of the colour qubit being one at each
+        position, NEQR pixels are the most likely colour at each position.
+
+        Args:
+            probabilities (np.ndarray): Probability of every basis state of the address and
+                colour qubits.
+
+        Returns:
+            np.ndarray: The retrieved image, with values between 0 and 255.
+
+        Raises:
+            Exception: If the encoding is not supported.
+        """
+        side = pow(2, int(self.required_qubits / 2))
+        probabilities = np.asarray(probabilities, dtype=float)
+        if self.encoding == "FRQI":
+            colors = probabilities.reshape(2, side, side)
+            total = colors.sum(axis=0)
+            ratio = np.divide(colors[1], total, out=np.zeros_like(total), where=total > 0)
+            retrieved: np.ndarray = 255.0 * np.sqrt(ratio)
+            return retrieved
+        if self.encoding == "NEQR":
+            colors = probabilities.reshape(256, side, side)
+            retrieved = REVERSED_BYTES[np.argmax(colors, axis=0)].astype(int)
+            retrieved[colors.sum(axis=0) == 0] = 0
+            return retrieved
+        raise Exception("Unknown encoding " + str(self.encoding))
+
+    def retrieve(
+        self, result: typing.Union[Result, typing.Dict[str, int], np.ndarray]
+    ) -> np.ndarray:
+        """Retrieve the image from the results, it requires measurements or saved probabilities.
+
+        Args:
+            result (Result): Result of the execution of the circuit, its counts, or the
+                probabilities of the encoding qubits.
+
+        Returns:
+            np.ndarray: The retrieved image.
+        """
+        with stage(self.metrics, "retrieve"):
+            return self.decode(self.probabilities(result))
+
+    def run(
+        self,
+        shots: int = 0,
+        method: str = "automatic",
+        seed: typing.Optional[int] = None,
+        **options: typing.Any,
+    ) -> typing.Any:
+        """Simulate the circuit with Aer and retrieve the image, see qimp.Execution.Runner.
+
+        Args:
+            shots (int): Number of measurements, if zero the exact probabilities are saved.
+            method (str): Aer simulation method, chosen from the circuit if "automatic".
+            seed (int): Seed of the simulator, for reproducible counts.
+            options (typing.Any): Other options of the AerSimulator.
+
+        Returns:
+            ExecutionResult: The retrieved image and the details of the execution.
+        """
+        from qimp.Execution.Runner import execute
+
+        return execute(self, shots, method, seed, **options)
+
+    @staticmethod
+    def show_image(image: np.ndarray, title: str = "retrieved image") -> None:
+        """Show a retrieved image in a figure.
+
+        Args:
+            image (np.ndarray): Image to show.
+            title (str): Title of the figure.
+
+        Returns: None
+        """
+        import matplotlib.pyplot as plt
+
         plt.figure(1)
-        multip = numOfShots / 100
-
-        retrieve_image_0 *= multip * 255.0
-        retrieve_image_0 = retrieve_image_0.astype("int")
-        retrieve_image_0 = retrieve_image_0.reshape(
-            (
-                pow(2, int(self.required_qubits / 2)),
-                pow(2, int(self.required_qubits / 2)),
-            )
-        )
-        # Plot the retrieved image to see if it is the same as the one encoded
-        plt.imshow(retrieve_image_0, cmap="gray", vmin=0, vmax=255)
-        plt.title("retrieved image")
+        plt.imshow(image, cmap="gray", vmin=0, vmax=255)
+        plt.title(title)
         plt.show()
 
+    def retrieve_and_show(self, result: Result, numOfShots: int = 0) -> None:
+        """Retrieve the image and show it, it requires measurements.
+
+        Args:
+            result (Result): Result of the execution of the circuit.
+            numOfShots (int): Unused, the counts are normalised by their total.
+
+        Returns: None
+
+        """
+        self.show_image(self.retrieve(result))
+
     def __info__(self) -> str:  # pragma: no cover
         """Show the state of the saved data of the image, useful for the reader.
 
@@ -251,4 +459,6 @@ class QuantumImage(object):
         Returns: None
 
         """
-        self.circuit.measure([int(x) for x in range(self.total_qubits)], self.total_wires)
+        self.circuit.measure(
+            [int(x) + self.n_aux_qubit for x in range(self.total_qubits)], self.total_wires
+        )
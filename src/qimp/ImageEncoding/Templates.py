@@ -0,0 +1,143 @@
+"""Parameterised encoding circuits shared by images of the same size."""
+import functools
+import typing
+
+import numpy as np
+from qiskit import ClassicalRegister, QuantumCircuit, QuantumRegister
+from qiskit.circuit import ParameterVector
+
+from qimp.Instrumentation.Metrics import stage
+
+from .Encodings import hadamard, mcry_walk, pixel_order, ucry_coefficients, ucry_ladder
+from .QuantumImage import QuantumImage
+
+
+class FRQITemplate(object):
+    """FRQI circuit of a given size whose rotation angles are parameters.
+
+    The structure of the FRQI circuit only depends on the size of the image, so it is built,
+    and optionally transpiled, once; every image is then encoded by binding its angles.
+    """
+
+    def __init__(self, required_qubits: int, method: str = "ucry", traversal: str = "row") -> None:
+        """
+        Returns an FRQI template.
+
+        Args:
+            required_qubits (int): Number of address qubits of the images.
+            method (str): "ucry" or "mcry", as in FRQI.
+            traversal (str): Pixel visiting order of the "mcry" method, "row" or "gray".
+
+        Returns: None
+
+        Raises:
+            Exception: If the method is unknown.
+        """
+        if method not in ("mcry", "ucry"):
+            raise Exception("Unknown FRQI method " + str(method))
+        self.required_qubits = required_qubits
+        self.method = method
+        self.traversal = traversal
+        self.parameters = ParameterVector("theta", pow(2, required_qubits))
+
+        half = int(required_qubits / 2)
+        self.circuit = QuantumCircuit(
+            QuantumRegister(half, "x"),
+            QuantumRegister(half, "y"),
+            QuantumRegister(1, "c"),
+            ClassicalRegister(required_qubits + 1, "classical"),
+        )
+        hadamard(self.circuit, list(range(required_qubits)))
+        if method == "ucry":
+            ucry_ladder(
+                self.circuit, list(self.parameters), list(range(required_qubits)), required_qubits
+            )
+        else:
+            order = pixel_order(required_qubits, traversal)
+            mcry_walk(self.circuit, list(self.parameters), order, 0, required_qubits)
+
+    def transpile(self, backend: typing.Any, **kwargs: typing.Any) -> QuantumCircuit:
+        """Transpile the template once per backend and options.
+
+        The transpilation goes through the transpile cache of qimp.Execution.Cache, keyed
+        by the method and operations of the backend, not only its name, so a template
+        stored on disk by an earlier run is not transpiled again.
+
+        Args:
+            backend (typing.Any): Target backend.
+            kwargs (typing.Any): Options of qiskit.transpile.
+
+        Returns:
+            QuantumCircuit: The transpiled template, still parameterised.
+        """
+        from qimp.Execution.Cache import cached_transpile
+
+        return typing.cast(QuantumCircuit, cached_transpile(self.circuit, backend, **kwargs))
+
+    def values(self, angles: np.ndarray) -> np.ndarray:
+        """Parameter values encoding the given pixel angles.
+
+        Args:
+            angles (np.ndarray): Angles of the pixels, as computed by compute_angles.
+
+        Returns:
+            np.ndarray: One value per parameter.
+        """
+        angles = np.asarray(angles, dtype=float).reshape(-1)
+        if self.method == "ucry":
+            return ucry_coefficients(2 * angles)
+        return angles
+
+    def bind(
+        self, quantumimage: QuantumImage, backend: typing.Any = None, **kwargs: typing.Any
+    ) -> QuantumCircuit:
+        """Encode an image by binding its angles to the template.
+
+        Args:
+            quantumimage (QuantumImage): Image to encode, its circuit is replaced.
+            backend (typing.Any): If given, bind the template transpiled for this backend.
+            kwargs (typing.Any): Options of qiskit.transpile.
+
+        Returns:
+            QuantumCircuit: The circuit of the image.
+
+        Raises:
+            Exception: If the image has already been encoded or has another size.
+        """
+        if quantumimage.encoding != "":
+            raise Exception("The image has allready been encoded")
+        if quantumimage.required_qubits != self.required_qubits:
+            raise Exception(
+                "The template encodes images with "
+                + str(self.required_qubits)
+                + " address qubits, got "
+                + str(quantumimage.required_qubits)
+            )
+        quantumimage.total_qubits = int(quantumimage.required_qubits + 1)
+        quantumimage.compute_angles()
+        with stage(quantumimage.metrics, "encoding", lambda: quantumimage.circuit):
+            quantumimage.init_circuit(1)
+            circuit = self.circuit if backend is None else self.transpile(backend, **kwargs)
+            values = self.values(quantumimage.angles)
+            quantumimage.circuit = circuit.assign_parameters(
+                {parameter: values[parameter.index] for parameter in circuit.parameters}
+            )
+        quantumimage.encoding = "FRQI"
+        return quantumimage.circuit
+
+
+@functools.lru_cache(maxsize=None)
+def frqi_template(
+    required_qubits: int, method: str = "ucry", traversal: str = "row"
+) -> FRQITemplate:
+    """Shared FRQI template of a given size, built on first use.
+
+    Args:
+        required_qubits (int): Number of address qubits of the images.
+        method (str): "ucry" or "mcry", as in FRQI.
+        traversal (str): Pixel visiting order of the "mcry" method, "row" or "gray".
+
+    Returns:
+        FRQITemplate: The template.
+    """
+    return FRQITemplate(required_qubits, method, traversal)
@@ -0,0 +1,235 @@
+"""Benchmarks of the encodings, filters and retrieval across image sizes."""
+import json
+import platform
+import typing
+
+import numpy as np
+import qiskit
+
+import qimp
+from qimp.Filters.Edges import qhed
+from qimp.Filters.Filters import sobel
+from qimp.ImageEncoding.Encodings import FRQI, NEQR
+from qimp.ImageEncoding.QuantumImage import QuantumImage
+from qimp.Instrumentation.Metrics import Metrics
+
+
+def _frqi_mcry(quantumimage: QuantumImage) -> None:
+    FRQI(quantumimage)
+
+
+def _frqi_ucry(quantumimage: QuantumImage) -> None:
+    FRQI(quantumimage, method="ucry")
+
+
+def _neqr_mcx(quantumimage: QuantumImage) -> None:
+    NEQR(quantumimage)
+
+
+def _neqr_esop(quantumimage: QuantumImage) -> None:
+    NEQR(quantumimage, method="esop")
+
+
+def _sobel(quantumimage: QuantumImage) -> None:
+    FRQI(quantumimage, method="ucry")
+    sobel(quantumimage)
+
+
+def _sobel_reversible(quantumimage: QuantumImage) -> None:
+    FRQI(quantumimage, method="ucry")
+    sobel(quantumimage, method="reversible")
+
+
+def _sobel_increment(quantumimage: QuantumImage) -> None:
+    FRQI(quantumimage, method="ucry")
+    sobel(quantumimage, method="increment")
+
+
+def _qhed(quantumimage: QuantumImage) -> None:
+    FRQI(quantumimage, method="ucry")
+    qhed(quantumimage)
+
+
+# name: (builder, largest side to build, largest side to transpile and simulate)
+# the limits keep the default run within minutes, max_side overrides them; sobel-increment
+# shares the limits of qhed, so the two edge filters are compared on the large images
+CASES: typing.Dict[str, typing.Tuple[typing.Callable[[QuantumImage], None], int, int]] = {
+    "FRQI-mcry": (_frqi_mcry, 16, 16),
+    "FRQI-ucry": (_frqi_ucry, 128, 128),
+    "NEQR-mcx": (_neqr_mcx, 128, 32),
+    "NEQR-esop": (_neqr_esop, 128, 32),
+    "sobel": (_sobel, 4, 4),
+    "sobel-reversible": (_sobel_reversible, 4, 4),
+    "sobel-increment": (_sobel_increment, 128, 64),
+    "qhed": (_qhed, 128, 64),
+}
+
+SIZES = [4, 8, 16, 32, 64, 128]
+
+# metrics compared with a tolerance, the others must not grow at all
+TIMINGS = ["build_time", "transpile_time", "simulation_time", "retrieve_time"]
+COUNTS = ["qubits", "gates", "depth", "transpiled_gates"]
+
+
+def benchmark_image(side: int, seed: int = 0) -> np.ndarray:
+    """Random grayscale image used by the benchmarks.
+
+    Args:
+        side (int): Side of the square image.
+        seed (int): Seed of the random generator.
+
+    Returns:
+        np.ndarray: The image.
+    """
+    return np.random.default_rng(seed).integers(0, 256, (side, side)).astype(float)
+
+
+def run_case(name: str, side: int, simulate: bool = True) -> typing.Dict[str, typing.Any]:
+    """Build, transpile, simulate and retrieve one image.
+
+    Args:
+        name (str): Name of the case in CASES.
+        side (int): Side of the image.
+        simulate (bool): Also transpile, simulate and retrieve the circuit.
+
+    Returns:
+        dict: The case, the size and the measured metrics, None when not measured.
+    """
+    from qiskit import transpile
+    from qiskit_aer import AerSimulator
+
+    builder = CASES[name][0]
+    metrics = Metrics()
+    quantumimage = QuantumImage(benchmark_image(side), metrics=metrics)
+    with metrics.stage("build", lambda: quantumimage.circuit) as build:
+        builder(quantumimage)
+    record: typing.Dict[str, typing.Any] = {
+        "case": name,
+        "side": side,
+        "qubits": build["qubits"],
+        "gates": build["gates"],
+        "depth": build["depth"],
+        "build_time": build["wall_time"],
+        "transpile_time": None,
+        "transpiled_gates": None,
+        "simulation_time": None,
+        "retrieve_time": None,
+    }
+    if not simulate:
+        return record
+
+    quantumimage.save_probabilities()
+    simulator = AerSimulator(method="statevector")
+    with metrics.stage("transpile") as transpiled:
+        circuit = transpile(quantumimage.circuit, simulator)
+        transpiled["transpiled_gates"] = circuit.size()
+    with metrics.stage("simulate"):
+        result = simulator.run(circuit, shots=1).result()
+    quantumimage.retrieve(result)
+
+    stages = {stage["name"]: stage for stage in metrics.stages}
+    record["transpile_time"] = stages["transpile"]["wall_time"]
+    record["transpiled_gates"] = stages["transpile"]["transpiled_gates"]
+    record["simulation_time"] = stages["simulate"]["wall_time"]
+    record["retrieve_time"] = stages["retrieve"]["wall_time"]
+    return record
+
+
+def run_benchmarks(
+    sizes: typing.Optional[typing.List[int]] = None,
+    cases: typing.Optional[typing.List[str]] = None,
+    max_side: int = 0,
+) -> typing.Dict[str, typing.Any]:
+    """Run the benchmark cases on all the sizes.
+
+    Args:
+        sizes (list): Image sides, defaults to SIZES.
+        cases (list): Names of the cases, defaults to all of CASES.
+        max_side (int): Largest side to build and simulate for every case, overriding the
+            limits of CASES when non zero.
+
+    Returns:
+        dict: The environment and one record per case and size, keyed "case/side".
+    """
+    results: typing.Dict[str, typing.Any] = {}
+    for name in cases or list(CASES):
+        build_limit, simulate_limit = CASES[name][1:]
+        if max_side:
+            build_limit = simulate_limit = max_side
+        for side in sizes or SIZES:
+            if side <= build_limit:
+                results[name + "/" + str(side)] = run_case(name, side, side <= simulate_limit)
+    return {
+        "environment": {
+            "qimp": qimp.__version__,
+            "qiskit": qiskit.__version__,
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+        },
+        "results": results,
+    }
+
+
+def compare(
+    results: typing.Dict[str, typing.Any],
+    baseline: typing.Dict[str, typing.Any],
+    tolerance: float = 0.25,
+    floor: float = 0.05,
+) -> typing.List[str]:
+    """Find the regressions of a run against a baseline.
+
+    A timing regresses when it grows by more than tolerance and more than floor seconds,
+    a gate, depth or qubit count regresses as soon as it grows.
+
+    Args:
+        results (dict): Output of run_benchmarks.
+        baseline (dict): Output of run_benchmarks for the reference version.
+        tolerance (float): Relative growth allowed on the timings.
+        floor (float): Absolute growth in seconds always allowed on the timings.
+
+    Returns:
+        list: One message per regression.
+    """
+    regressions = []
+    for key, record in results["results"].items():
+        reference = baseline["results"].get(key)
+        if reference is None:
+            continue
+        for metric in TIMINGS + COUNTS:
+            new, old = record.get(metric), reference.get(metric)
+            if new is None or old is None:
+                continue
+            if metric in TIMINGS:
+                regressed = new > old * (1 + tolerance) and new - old > floor
+            else:
+                regressed = new > old
+            if regressed:
+                regressions.append(key + " " + metric + ": " + str(old) + " -> " + str(new))
+    return regressions
+
+
+def save(results: typing.Dict[str, typing.Any], path: str) -> None:
+    """Write benchmark results as JSON.
+
+    Args:
+        results (dict): Output of run_benchmarks.
+        path (str): Destination file.
+
+    Returns: None
+    """
+    with open(path, "w") as file:
+        json.dump(results, file, indent=2, sort_keys=True)
+        file.write("\n")
+
+
+def load(path: str) -> typing.Dict[str, typing.Any]:
+    """Read benchmark results written by save.
+
+    Args:
+        path (str): Source file.
+
+    Returns:
+        dict: The results.
+    """
+    with open(path) as file:
+        return typing.cast(typing.Dict[str, typing.Any], json.load(file))
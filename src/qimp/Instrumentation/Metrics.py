@@ -0,0 +1,118 @@
+"""Stage level metrics of the image pipeline."""
+import contextlib
+import json
+import time
+import tracemalloc
+import typing
+
+from qiskit import QuantumCircuit
+
+CircuitSource = typing.Union[QuantumCircuit, typing.Callable[[], QuantumCircuit], None]
+
+
+class Metrics(object):
+    """Records wall time, peak memory and circuit size of every stage of a pipeline.
+
+    A stage is recorded as a dict with its name, its wall time in seconds and, when
+    available, the peak memory allocated by Python in bytes and the number of gates, the
+    depth and the number of qubits of the circuit at the end of the stage. Nothing is
+    printed, the records are read with to_dict() or to_json().
+    """
+
+    def __init__(self, track_memory: bool = False, track_depth: bool = True) -> None:
+        """
+        Returns an empty Metrics object.
+
+        Args:
+            track_memory (bool): Trace the Python allocations to record the peak memory of
+                each stage, it slows the stages down.
+            track_depth (bool): Record the circuit depth, which needs a pass on the circuit.
+
+        Returns: None
+        """
+        self.track_memory = track_memory
+        self.track_depth = track_depth
+        self.stages: typing.List[typing.Dict[str, typing.Any]] = []
+
+    @contextlib.contextmanager
+    def stage(
+        self, name: str, circuit: CircuitSource = None
+    ) -> typing.Iterator[typing.Dict[str, typing.Any]]:
+        """Record a stage of the pipeline.
+
+        Args:
+            name (str): Name of the stage.
+            circuit (QuantumCircuit): Circuit to describe at the end of the stage, or a
+                callable returning it.
+
+        Yields:
+            dict: The record of the stage, the caller can add its own entries.
+        """
+        record: typing.Dict[str, typing.Any] = {"name": name}
+        started_tracing = False
+        if self.track_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                started_tracing = True
+            tracemalloc.reset_peak()
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record["wall_time"] = time.perf_counter() - start
+            if self.track_memory:
+                record["peak_memory"] = tracemalloc.get_traced_memory()[1]
+                if started_tracing:
+                    tracemalloc.stop()
+            described = circuit() if callable(circuit) else circuit
+            if described is not None:
+                record["gates"] = described.size()
+                record["qubits"] = described.num_qubits
+                if self.track_depth:
+                    record["depth"] = described.depth()
+            self.stages.append(record)
+
+    def to_dict(self) -> typing.Dict[str, typing.Any]:
+        """Export the records.
+
+        Returns:
+            dict: The stages in the order they ended and their total wall time.
+        """
+        return {
+            "stages": [dict(record) for record in self.stages],
+            "total_wall_time": sum(record["wall_time"] for record in self.stages),
+        }
+
+    def to_json(self, path: str = "") -> str:
+        """Export the records as JSON.
+
+        Args:
+            path (str): File to write the JSON to, if given.
+
+        Returns:
+            str: The JSON document.
+        """
+        document = json.dumps(self.to_dict(), indent=2)
+        if path:
+            with open(path, "w") as file:
+                file.write(document)
+        return document
+
+
+def stage(
+    metrics: typing.Optional[Metrics], name: str, circuit: CircuitSource = None
+) -> typing.ContextManager[typing.Any]:
+    """Record a stage if metrics are enabled, do nothing otherwise.
+
+    Args:
+        metrics (Metrics): Metrics of the image, or None.
+        name (str): Name of the stage.
+        circuit (QuantumCircuit): Circuit to describe at the end of the stage, or a callable
+            returning it.
+
+    Returns:
+        typing.ContextManager: The context of the stage.
+    """
+    if metrics is None:
+        return contextlib.nullcontext()
+    return metrics.stage(name, circuit)
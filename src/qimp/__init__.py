@@ -1,5 +1,25 @@
 """Top-level package for qimp."""
+import typing
 
 __author__ = """Giacomo Antonioli"""
 __email__ = "giacomo.antonioli@phd.unipi.it"
 __version__ = "0.2.1"
+
+
+def __getattr__(name: str) -> typing.Any:
+    """Import the execution layer on first use.
+
+    Args:
+        name (str): Name of the module attribute.
+
+    Returns:
+        typing.Any: qimp.Execution.Runner.execute for ``execute``.
+
+    Raises:
+        AttributeError: If the attribute does not exist.
+    """
+    if name == "execute":
+        from qimp.Execution.Runner import execute
+
+        return execute
+    raise AttributeError("module " + repr(__name__) + " has no attribute " + repr(name))
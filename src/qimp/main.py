@@ -1,12 +1,9 @@
-import math
-
 from ImageEncoding.Encodings import FRQI
 from ImageEncoding.QuantumImage import QuantumImage, generate_example_image
 
 # Press the green button in the gutter to run the script.
 if __name__ == "__main__":
     side = 16
-    ncolorsencoding = 8
     image = QuantumImage(generate_example_image(side=side), zooming_factor=1)
     print(image.__info__())
     print(image.image)
@@ -20,10 +17,8 @@ if __name__ == "__main__":
     print("drawing circ")
     # image.draw_circuit()
 
-    image.circuit.measure(
-        [x for x in range(0, int(2 * math.log(side, 2)) + ncolorsencoding)],
-        [x for x in range(0, int(2 * math.log(side, 2)) + ncolorsencoding)],
-    )
+    # exact probabilities of the encoding qubits, no shots needed
+    image.save_probabilities()
     print(image.circuit)
     import time
 
@@ -34,10 +29,9 @@ if __name__ == "__main__":
     circ = transpile(image.circuit, simulator)
 
     # Run and get unitary
-    result = simulator.run(circ).result()
+    result = simulator.run(circ, shots=1).result()
     # In[ ]:
     #############################################
-    numOfShots = 1000000
 
     start_time = time.time()
 
@@ -47,7 +41,7 @@ if __name__ == "__main__":
     print(result)
     print("--- %s seconds ---" % (time.time() - start_time))
     # print(len(result.get_counts(image.circuit)))
-    image.retrieve_and_show(result, numOfShots)
+    image.show_image(image.retrieve(result))
     # Create an empty array to save the retrieved image
     # original = True
     # counts = result.get_counts(image.circuit)
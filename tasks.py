@@ -140,6 +140,13 @@ def tests(c):
     _run(c, f"poetry run pytest {' '.join(pytest_options)} {TEST_DIR} {SOURCE_DIR}")
 
 
+@task(help={"compare": "Baseline to compare with, empty to skip the comparison"})
+def bench(c, compare="benchmarks/baseline.json"):
+    # type: (Context, str) -> None
+    """Run the benchmark suite."""
+    _run(c, f"poetry run python {ROOT_DIR.joinpath('benchmarks/run.py')} --compare '{compare}'")
+
+
 @task(
     help={
         "fmt": "Build a local report: report, html, json, annotate, html, xml.",
@@ -0,0 +1,40 @@
+"""Tests for the `Batch` module."""
+import numpy as np
+import pytest
+
+from qimp.Execution.Batch import build_batch, run_batch
+from qimp.Instrumentation.Metrics import Metrics
+
+
+@pytest.mark.parametrize("encoding", ["FRQI", "NEQR"])
+def test_run_batch(encoding: str) -> None:
+    """Every image of the batch is retrieved from a single job."""
+    rng = np.random.default_rng(0)
+    images = [rng.integers(0, 256, (4, 4)).astype(float) for _ in range(3)]
+    metrics = Metrics()
+
+    retrieved = run_batch(images, encoding, metrics=metrics)
+
+    assert retrieved.shape == (3, 4, 4)
+    assert np.allclose(retrieved, np.stack(images))
+    assert [record["name"] for record in metrics.stages] == ["build", "simulate", "retrieve"]
+
+
+def test_run_batch_shots() -> None:
+    """Measured batches are retrieved from the counts of each experiment."""
+    images = [np.full((2, 2), 255.0), np.zeros((2, 2))]
+
+    retrieved = run_batch(images, "NEQR", shots=16)
+
+    assert np.allclose(retrieved, np.stack(images))
+
+
+def test_build_batch_failure() -> None:
+    """Unknown encodings and images of different sizes are rejected."""
+    with pytest.raises(Exception) as excinfo:
+        build_batch([np.zeros((4, 4))], "OQIM")
+    assert str(excinfo.value) == "Unknown encoding OQIM"
+
+    with pytest.raises(Exception) as excinfo:
+        build_batch([np.zeros((4, 4)), np.zeros((8, 8))])
+    assert str(excinfo.value) == "All the images of a batch must have the same size"
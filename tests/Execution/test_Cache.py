@@ -0,0 +1,116 @@
+"""Tests for the `Cache` module."""
+import os
+from typing import Any, Dict
+
+import numpy as np
+from qiskit import QuantumCircuit
+from qiskit.circuit import Parameter
+from qiskit.circuit.library import RYGate
+from qiskit_aer import AerSimulator
+
+from qimp.Execution.Cache import TranspileCache, _operation, fingerprint, transpile_cache
+from qimp.Filters import Gates
+from qimp.ImageEncoding.Encodings import NEQR
+from qimp.ImageEncoding.QuantumImage import QuantumImage
+from qimp.ImageEncoding.Templates import FRQITemplate
+
+
+def neqr_circuit(seed: int) -> QuantumCircuit:
+    """NEQR circuit of a random 4x4 image."""
+    quantumimage = QuantumImage(np.random.default_rng(seed).integers(0, 256, (4, 4)))
+    NEQR(quantumimage)
+    return quantumimage.circuit
+
+
+def test_fingerprint() -> None:
+    """Equal structures share their fingerprint, different gates or parameters do not."""
+    assert fingerprint(neqr_circuit(0)) == fingerprint(neqr_circuit(0))
+    assert fingerprint(neqr_circuit(0)) != fingerprint(neqr_circuit(1))
+
+    first, second = QuantumCircuit(2), QuantumCircuit(2)
+    first.ry(0.1, 0)
+    second.ry(0.2, 0)
+    assert fingerprint(first) != fingerprint(second)
+
+    # both gates are named Traslation, only their definitions differ
+    translation, adder = QuantumCircuit(9), QuantumCircuit(9)
+    translation.append(Gates.make_translation(2, 3, 2, False), range(9))
+    adder.append(Gates.make_translation(2, 3, 2, False, swapped=False), range(9))
+    assert fingerprint(translation) != fingerprint(adder)
+
+
+def test_fingerprint_global_phase() -> None:
+    """Circuits, or definitions of controlled gates, differing only in phase are told apart."""
+    first, second = QuantumCircuit(1), QuantumCircuit(1, global_phase=np.pi / 2)
+    assert fingerprint(first) != fingerprint(second)
+    second.global_phase = Parameter("phase")
+    assert fingerprint(first) != fingerprint(second)
+
+    circuits = []
+    for phase in (0.0, np.pi / 2):
+        definition = QuantumCircuit(1, global_phase=phase, name="custom")
+        definition.x(0)
+        circuit = QuantumCircuit(2)
+        circuit.append(definition.to_gate().control(1), [0, 1])
+        circuits.append(circuit)
+    assert fingerprint(circuits[0]) != fingerprint(circuits[1])
+
+
+def test_fingerprint_memo() -> None:
+    """Operations built on the fly are not mistaken for earlier ones whose id is reused."""
+    memo: Dict[int, Any] = {}
+    digests = [_operation(RYGate(0.1 * index), memo) for index in range(1, 6)]
+    assert len(set(digests)) == 5
+
+
+def test_transpile_cache() -> None:
+    """A circuit is transpiled once, and copies are returned."""
+    cache = TranspileCache(maxsize=2)
+    backend = AerSimulator(method="statevector")
+
+    first = cache.transpile(neqr_circuit(0), backend)
+    first.measure_all()
+    second, third = cache.transpile([neqr_circuit(0), neqr_circuit(1)], backend)
+
+    assert (cache.hits, cache.misses) == (1, 2)
+    assert second.count_ops().get("measure", 0) == 0
+    assert second != third
+
+    cache.transpile(neqr_circuit(0), backend, optimization_level=0)
+    assert (cache.hits, cache.misses) == (1, 3)
+    assert len(cache.circuits) == 2
+
+
+def test_transpile_backends() -> None:
+    """Backends sharing a name but not their method never share an entry, templates included."""
+    cache = TranspileCache()
+    statevector = AerSimulator(method="statevector")
+    stabilizer = AerSimulator(method="extended_stabilizer")
+    assert statevector.name == stabilizer.name
+
+    cache.transpile(neqr_circuit(0), statevector)
+    cache.transpile(neqr_circuit(0), stabilizer)
+    assert (cache.hits, cache.misses) == (0, 2)
+
+    transpile_cache.clear()
+    template = FRQITemplate(4, method="mcry")
+    template.transpile(statevector)
+    template.transpile(stabilizer)
+    template.transpile(AerSimulator(method="statevector"))
+    assert (transpile_cache.hits, transpile_cache.misses) == (1, 2)
+
+
+def test_transpile_disk_store(tmp_path: Any) -> None:
+    """The transpiled circuits are reloaded from disk and the store is size bounded."""
+    backend = AerSimulator(method="statevector")
+    built = TranspileCache(directory=str(tmp_path)).transpile(neqr_circuit(0), backend)
+
+    cache = TranspileCache(directory=str(tmp_path))
+    loaded = cache.transpile(neqr_circuit(0), backend)
+    assert (cache.hits, cache.misses) == (1, 0)
+    assert loaded == built
+
+    size = os.path.getsize(next(tmp_path.iterdir()))
+    cache = TranspileCache(directory=str(tmp_path), max_bytes=size)
+    cache.transpile(neqr_circuit(1), backend)
+    assert len(list(tmp_path.iterdir())) == 1
@@ -0,0 +1,80 @@
+"""Tests for the `Runner` module."""
+import numpy as np
+import pytest
+from qiskit import QuantumCircuit
+
+import qimp
+from qimp.Execution.Runner import ExecutionResult, choose_method, execute
+from qimp.Filters.Filters import sobel
+from qimp.ImageEncoding.Encodings import FRQI
+from qimp.ImageEncoding.QuantumImage import QuantumImage
+
+
+def encoded(side: int = 4) -> QuantumImage:
+    """FRQI image with random pixels."""
+    quantumimage = QuantumImage(np.random.default_rng(0).integers(0, 256, (side, side)))
+    FRQI(quantumimage, method="ucry")
+    return quantumimage
+
+
+def test_execute() -> None:
+    """The exact probabilities give back the image, the circuit of the image is untouched."""
+    quantumimage = encoded()
+    size = quantumimage.circuit.size()
+
+    result = execute(quantumimage)
+
+    assert isinstance(result, ExecutionResult)
+    assert result.method == "statevector"
+    assert result.counts is None
+    assert np.allclose(result.image, quantumimage.image)
+    assert quantumimage.circuit.size() == size
+
+
+def test_execute_shots() -> None:
+    """The counts are reproducible with a seed."""
+    quantumimage = encoded()
+
+    first = quantumimage.run(shots=2000, seed=7)
+    second = qimp.execute(quantumimage, shots=2000, seed=7)
+
+    assert first.counts == second.counts
+    assert sum(first.counts.values()) == 2000
+    assert np.isclose(first.probabilities.sum(), 1.0)
+
+
+def test_choose_method() -> None:
+    """The method follows the gates, the resets, the shots and the size of the circuit."""
+    assert choose_method(encoded().circuit) == "statevector"
+
+    clifford = QuantumCircuit(60)
+    clifford.h(0)
+    for qubit in range(59):
+        clifford.cx(qubit, qubit + 1)
+    assert choose_method(clifford) == "stabilizer"
+
+    chain = clifford.copy()
+    chain.ry(0.3, 5)
+    assert choose_method(chain) == "matrix_product_state"
+    chain.t(2)
+    assert choose_method(chain, shots=100, max_qubits=30) == "matrix_product_state"
+    chain.data.pop(-2)
+    assert choose_method(chain, shots=100, max_qubits=30) == "extended_stabilizer"
+
+    quantumimage = QuantumImage(np.zeros((2, 2)))
+    FRQI(quantumimage)
+    sobel(quantumimage)
+    assert choose_method(quantumimage.circuit, max_qubits=20) == "density_matrix"
+    assert choose_method(quantumimage.circuit, shots=100, max_qubits=20) == "statevector"
+    assert choose_method(quantumimage.circuit, shots=5000, max_qubits=20) == "density_matrix"
+    with pytest.raises(Exception) as excinfo:
+        choose_method(quantumimage.circuit, max_qubits=16)
+    assert str(excinfo.value) == (
+        "The exact probabilities of a circuit with resets need a density matrix of 10 qubits, "
+        "run it with shots or without resets"
+    )
+
+    quantumimage = QuantumImage(np.zeros((2, 2)))
+    FRQI(quantumimage)
+    sobel(quantumimage, method="reversible")
+    assert choose_method(quantumimage.circuit) == "statevector"
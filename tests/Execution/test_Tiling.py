@@ -0,0 +1,53 @@
+"""Tests for the `Tiling` module."""
+import numpy as np
+import pytest
+
+from qimp.Execution.Tiling import run_tiled, split_tiles, stitch_tiles
+from qimp.ImageEncoding.QuantumImage import QuantumImage
+
+
+@pytest.mark.parametrize("halo", [0, 1])
+def test_split_stitch(halo: int) -> None:
+    """Stitching the cores of the tiles gives back the image."""
+    image = np.arange(10 * 13, dtype=float).reshape(10, 13)
+
+    tiles, grid = split_tiles(image, 4, halo)
+
+    stride = 4 - 2 * halo
+    assert tiles.shape == (grid[0] * grid[1], 4, 4)
+    assert grid == (int(np.ceil(10 / stride)), int(np.ceil(13 / stride)))
+    assert np.array_equal(stitch_tiles(tiles, grid, (image.shape[0], image.shape[1]), halo), image)
+    if halo:
+        # the halo holds the neighbours of the core
+        assert np.array_equal(tiles[1, 1:3, 0], image[0:2, 1])
+
+
+def test_split_tiles_failure() -> None:
+    """The tiles must be powers of two larger than twice the halo."""
+    with pytest.raises(Exception) as excinfo:
+        split_tiles(np.zeros((4, 4)), 6)
+    assert str(excinfo.value) == "The side of the tiles must be a power of two, got 6"
+
+    with pytest.raises(Exception) as excinfo:
+        split_tiles(np.zeros((4, 4)), 2, 1)
+    assert str(excinfo.value) == "The halo leaves no pixels in the tiles"
+
+
+def test_run_tiled() -> None:
+    """An image larger than the tiles is retrieved from its tiles."""
+    image = np.random.default_rng(0).integers(0, 256, (12, 10)).astype(float)
+
+    assert np.allclose(run_tiled(image, 4, batch_size=5), image)
+    assert np.allclose(run_tiled(image, 8, 1, "NEQR"), image)
+
+
+def test_run_tiled_transform() -> None:
+    """The transform is applied to every tile before it is run."""
+    image = np.random.default_rng(1).integers(0, 256, (6, 6)).astype(float)
+
+    def invert(quantumimage: QuantumImage) -> None:
+        quantumimage.circuit.x(quantumimage.c_wire)
+
+    retrieved = run_tiled(image, 4, 1, transform=invert)
+
+    assert np.allclose(retrieved, 255.0 * np.cos(np.arcsin(image / 255.0)))
@@ -0,0 +1,51 @@
+"""Tests for the `Edges` module."""
+import numpy as np
+import pytest
+from qiskit.quantum_info import Statevector
+
+from qimp.Filters.Edges import detect_edges, qhed, retrieve_edges
+from qimp.ImageEncoding.Encodings import FRQI, NEQR
+from qimp.ImageEncoding.QuantumImage import QuantumImage
+
+
+@pytest.mark.parametrize("axis", ["x", "y"])
+def test_qhed(axis: str) -> None:
+    """The edge map is the difference of every pixel with the next one along the axis."""
+    image = np.random.default_rng(0).integers(0, 256, (4, 4)).astype(float)
+    quantumimage = QuantumImage(image)
+    FRQI(quantumimage, method="ucry")
+    qhed(quantumimage, axis)
+
+    assert quantumimage.circuit.num_qubits == 1 + quantumimage.total_qubits
+    probabilities = Statevector(quantumimage.circuit).probabilities()
+    edges = retrieve_edges(quantumimage, probabilities)
+    following = np.roll(image, -1, axis=1 if axis == "x" else 0)
+    assert np.allclose(edges, np.abs(following - image))
+
+
+def test_detect_edges() -> None:
+    """Both edge maps of a square are computed in one job."""
+    image = np.zeros((8, 8))
+    image[2:6, 2:6] = 255.0
+
+    vertical, horizontal = detect_edges(image)
+
+    assert np.allclose(vertical, np.abs(np.roll(image, -1, axis=1) - image))
+    assert np.allclose(horizontal, np.abs(np.roll(image, -1, axis=0) - image))
+    assert np.allclose(vertical[2:6, [1, 5]], 255.0)
+    assert np.allclose(horizontal[[1, 5], 2:6], 255.0)
+
+
+def test_qhed_failure() -> None:
+    """Images not encoded with FRQI and unknown axes are rejected."""
+    quantumimage = QuantumImage(np.zeros((4, 4)))
+    NEQR(quantumimage)
+    with pytest.raises(Exception) as excinfo:
+        qhed(quantumimage)
+    assert str(excinfo.value) == "The edge detection needs an FRQI image, got NEQR"
+
+    quantumimage = QuantumImage(np.zeros((4, 4)))
+    FRQI(quantumimage)
+    with pytest.raises(Exception) as excinfo:
+        qhed(quantumimage, "z")
+    assert str(excinfo.value) == "Unknown axis z"
@@ -0,0 +1,180 @@
+"""Tests for the `Emulation` module."""
+import typing
+
+import numpy as np
+import pytest
+from qiskit import QuantumCircuit, QuantumRegister, transpile
+from qiskit.circuit import ControlledGate
+from qiskit.circuit.library import UnitaryGate
+from qiskit.quantum_info import Operator, Statevector
+from qiskit_aer import AerSimulator
+from qiskit_aer.library import SaveProbabilities
+
+from qimp.Filters.Emulation import Emulator, emulate_sobel
+from qimp.Filters.Filters import Program, add_filter_qubits, run_program, sobel
+from qimp.ImageEncoding.Encodings import FRQI, NEQR
+from qimp.ImageEncoding.QuantumImage import QuantumImage
+
+PROGRAM: Program = [
+    ("h", 0),
+    ("h", 3),
+    ("x", 1),
+    ("x", 2),
+    ("translate", "x", 1, False),
+    ("barrier",),
+    ("translate", "y", -1, True),
+    ("x", 3),
+    ("translate", "x", -1, False),
+]
+
+
+def simulate(image: np.ndarray, program: Program) -> np.ndarray:
+    """Distribution of the filter circuit, every reset replaced by a swap with a fresh qubit.
+
+    Swapping the reset qubit out leaves the other qubits in the state the reset would, so a
+    statevector simulation gives the exact distribution of the circuit.
+    """
+    quantumimage = QuantumImage(image)
+    FRQI(quantumimage, method="ucry")
+    add_filter_qubits(quantumimage, 4)
+    run_program(quantumimage, program, quantumimage.circuit)
+    resets = quantumimage.circuit.count_ops()["reset"]
+    trash = QuantumRegister(resets, "trash")
+    circuit = QuantumCircuit(*quantumimage.circuit.qregs, trash)
+    fresh = iter(trash)
+    for instruction in quantumimage.circuit.data:
+        if instruction.operation.name == "reset":
+            circuit.swap(instruction.qubits[0], next(fresh))
+        else:
+            circuit.append(instruction)
+    width = quantumimage.n_aux_qubit + quantumimage.total_qubits
+    top_carry = width + quantumimage.num_summing + quantumimage.num_carry - 1
+    qubits = list(range(width)) + [top_carry]
+    circuit.append(SaveProbabilities(len(qubits)), qubits)
+    simulator = AerSimulator(method="statevector")
+    result = simulator.run(transpile(circuit, simulator), shots=1).result()
+    return np.asarray(result.data(0)["probabilities"])
+
+
+def test_emulator() -> None:
+    """The emulation gives the distribution of the filter circuit."""
+    image = np.random.default_rng(0).integers(0, 256, (4, 4)).astype(float)
+    emulator = Emulator(QuantumImage(image), 4, "FRQI")
+
+    emulator.run(PROGRAM)
+
+    assert np.allclose(emulator.probabilities(), simulate(image, PROGRAM))
+
+
+@pytest.mark.parametrize("encoding", [FRQI, NEQR])
+def test_emulate_sobel(encoding: typing.Any) -> None:
+    """The filter moves the probability without losing any."""
+    quantumimage = QuantumImage(np.random.default_rng(1).integers(0, 256, (8, 8)))
+    encoding(quantumimage)
+
+    emulator = emulate_sobel(quantumimage)
+
+    assert emulator.statevector().shape == (pow(2, 4 + quantumimage.total_qubits + 1),)
+    assert np.isclose(emulator.probabilities().sum(), 1.0)
+    probabilities = emulator.encoding_probabilities()
+    assert probabilities.shape == (pow(2, quantumimage.total_qubits),)
+    assert quantumimage.retrieve(probabilities).shape == (8, 8)
+
+
+def test_adder_sobel() -> None:
+    """The emulation gives the distribution of the sobel circuit, resets included."""
+    image = np.random.default_rng(5).integers(0, 256, (2, 2)).astype(float)
+    quantumimage = QuantumImage(image)
+    FRQI(quantumimage, method="ucry")
+    sobel(quantumimage)
+
+    # the controlled translations are given as matrices, built from the one of the adder,
+    # their transpilation to the basis gates is far slower than the simulation
+    circuit = quantumimage.circuit.copy_empty_like()
+    for instruction in quantumimage.circuit.data:
+        operation = instruction.operation
+        if not isinstance(operation, ControlledGate):
+            circuit.append(instruction)
+            continue
+        adder = Operator(operation.base_gate.definition).data
+        enabled = np.zeros((pow(2, operation.num_ctrl_qubits),) * 2)
+        enabled[operation.ctrl_state, operation.ctrl_state] = 1.0
+        matrix = np.kron(adder, enabled) + np.kron(
+            np.eye(len(adder)), np.eye(len(enabled)) - enabled
+        )
+        circuit.append(UnitaryGate(matrix), instruction.qubits)
+    qubits = [quantumimage.n_aux_qubit + x for x in range(quantumimage.total_qubits)]
+    circuit.append(SaveProbabilities(len(qubits)), qubits)
+    simulator = AerSimulator(method="density_matrix")
+    result = simulator.run(transpile(circuit, simulator), shots=1).result()
+
+    emulator = emulate_sobel(QuantumImage(image), "FRQI")
+    probabilities = np.asarray(result.data(0)["probabilities"])
+    assert np.allclose(probabilities, emulator.encoding_probabilities())
+
+
+def test_increment_sobel() -> None:
+    """The increment translations give the exact state the emulation computes."""
+    image = np.random.default_rng(2).integers(0, 256, (4, 4)).astype(float)
+    quantumimage = QuantumImage(image)
+    FRQI(quantumimage, method="ucry")
+    sobel(quantumimage, method="increment")
+
+    circuit = quantumimage.circuit
+    assert circuit.num_qubits == 4 + quantumimage.total_qubits
+    assert "reset" not in circuit.count_ops()
+    emulator = emulate_sobel(QuantumImage(image), "FRQI", method="increment")
+    assert np.allclose(Statevector(circuit).data, emulator.statevector())
+
+    adder = emulate_sobel(QuantumImage(image), "FRQI")
+    assert np.allclose(emulator.encoding_probabilities(), adder.encoding_probabilities())
+
+
+def test_reversible_sobel() -> None:
+    """The reversible translations leave every ancilla in zero and the emulated state."""
+    image = np.random.default_rng(4).integers(0, 256, (2, 2)).astype(float)
+    quantumimage = QuantumImage(image)
+    FRQI(quantumimage, method="ucry")
+    sobel(quantumimage, method="reversible")
+
+    assert "reset" not in quantumimage.circuit.count_ops()
+    state = Statevector(quantumimage.circuit).data.reshape(
+        pow(2, quantumimage.num_carry),
+        pow(2, quantumimage.num_summing),
+        pow(2, quantumimage.n_aux_qubit + quantumimage.total_qubits),
+    )
+    emulator = emulate_sobel(QuantumImage(image), "FRQI", method="reversible")
+    # the emulated state has norm one, so the states with a non zero ancilla are empty
+    assert np.allclose(state[0, 0, :], emulator.statevector())
+
+
+def test_increment_program() -> None:
+    """Hadamards after the increment translations are emulated exactly."""
+    program = PROGRAM + [("h", 0), ("translate", "y", 1, False), ("h", 3)]
+    image = np.random.default_rng(3).integers(0, 256, (4, 4)).astype(float)
+    quantumimage = QuantumImage(image)
+    FRQI(quantumimage, method="ucry")
+    add_filter_qubits(quantumimage, 4, adder=False)
+    run_program(quantumimage, program, quantumimage.circuit, "increment")
+
+    emulator = Emulator(QuantumImage(image), 4, "FRQI", "increment")
+    emulator.run(program)
+
+    assert np.allclose(Statevector(quantumimage.circuit).data, emulator.statevector())
+
+
+def test_emulator_failure() -> None:
+    """Hadamards after a translation and unknown operations are rejected."""
+    emulator = Emulator(QuantumImage(np.zeros((4, 4))), 2, "FRQI")
+
+    with pytest.raises(Exception) as excinfo:
+        emulator.run([("translate", "x", 1, False), ("h", 0)])
+    assert str(excinfo.value) == "The emulation cannot apply a Hadamard after a translation"
+
+    with pytest.raises(Exception) as excinfo:
+        emulator.run([("swap", 0, 1)])
+    assert str(excinfo.value) == "Unknown filter operation swap"
+
+    with pytest.raises(Exception) as excinfo:
+        Emulator(QuantumImage(np.zeros((4, 4))), 2, "FRQI", "subtractor")
+    assert str(excinfo.value) == "Unknown translation method subtractor"
@@ -1,4 +1,7 @@
+from typing import Any
+
 from qiskit import QuantumCircuit, QuantumRegister
+from qiskit.quantum_info import Operator
 
 from qimp.Filters import Gates
 
@@ -32,3 +35,79 @@ def test_make_carry_gate() -> QuantumCircuit:
     result = Gates.make_carry_gate()
 
     assert result == expected_circuit
+
+
+def test_make_translation_cached() -> None:
+    """The controlled translations are synthesised once per set of parameters."""
+    Gates.get_translation.cache_clear()
+
+    first = Gates.make_translation(1, 2, 2, False)
+    second = Gates.make_translation(1, 2, 2, False)
+    skipped = Gates.make_translation(1, 2, 2, True)
+
+    assert first is second
+    assert first.num_ctrl_qubits == 2
+    assert skipped.num_ctrl_qubits == 1
+    assert Gates.get_translation.cache_info().misses == 2
+
+
+def test_translation_circuit_fresh() -> None:
+    """The uncontrolled circuits are built anew, editing one leaves the others untouched."""
+    first = Gates.make_translation_circuit(1, 2)
+    size = first.size()
+    first.x(0)
+
+    assert Gates.make_translation_circuit(1, 2).size() == size
+    assert Gates.make_adder_circuit(1, 2) is not Gates.make_adder_circuit(1, 2)
+
+
+def test_translation_disk_store(tmp_path: Any) -> None:
+    """The controlled translations are reloaded from the on-disk store."""
+    Gates.set_translation_cache_dir(str(tmp_path))
+    try:
+        Gates.get_translation.cache_clear()
+        built = Gates.make_translation(1, 2, 2, False)
+        assert len(list(tmp_path.iterdir())) == 1
+
+        Gates.get_translation.cache_clear()
+        loaded = Gates.make_translation(1, 2, 2, False)
+    finally:
+        Gates.set_translation_cache_dir(None)
+        Gates.get_translation.cache_clear()
+
+    assert loaded is not built
+    assert loaded.num_ctrl_qubits == built.num_ctrl_qubits
+    assert Operator(loaded).equiv(Operator(built))
+
+
+def test_add_constant() -> None:
+    """Adding a constant maps every basis state of the register to its sum modulo the size."""
+    for shift in range(-8, 8):
+        circuit = QuantumCircuit(4)
+        Gates.add_constant(circuit, [0], [1, 2, 3], shift)
+        matrix = Operator(circuit).data
+        for value in range(8):
+            # the control qubit is the lowest bit of the basis index
+            assert matrix[2 * ((value + shift) % 8) + 1, 2 * value + 1] == 1
+            assert matrix[2 * value, 2 * value] == 1
+
+
+def test_adder_circuit() -> None:
+    """The adder adds the first register to the second one, flipping the top carry."""
+    matrix = Operator(Gates.make_adder_circuit(2, 3)).data
+    for first in range(4):
+        for second in range(4):
+            total = first + second
+            # qubits: first register, second register, carries, the least significant first
+            source = first + 4 * second
+            target = first + 4 * (total % 4) + 16 * 4 * (total // 4)
+            assert matrix[target, source] == 1
+
+
+def test_modular_adder_circuit() -> None:
+    """Without overflow the sum is taken modulo the size and the carries are restored."""
+    matrix = Operator(Gates.make_adder_circuit(2, 3, overflow=False)).data
+    for first in range(4):
+        for second in range(4):
+            source = first + 4 * second
+            assert matrix[first + 4 * ((first + second) % 4), source] == 1
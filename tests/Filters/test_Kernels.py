@@ -0,0 +1,93 @@
+"""Tests for the `Kernels` module."""
+import numpy as np
+import pytest
+from qiskit.quantum_info import Statevector
+
+from qimp.Filters.Emulation import Emulator
+from qimp.Filters.Kernels import KERNELS, compile_kernel, convolve
+from qimp.ImageEncoding.Encodings import FRQI
+from qimp.ImageEncoding.QuantumImage import QuantumImage
+
+
+def correlate(amplitudes: np.ndarray, kernel: np.ndarray) -> np.ndarray:
+    """Cyclic correlation of the last two axes, the reference of the compiled programs."""
+    rows, cols = kernel.shape
+    result = np.zeros_like(amplitudes)
+    for row in range(rows):
+        for col in range(cols):
+            moved = np.roll(amplitudes, (rows // 2 - row, cols // 2 - col), axis=(-2, -1))
+            result = result + kernel[row, col] * moved
+    return result
+
+
+@pytest.mark.parametrize("name", ["sobel_x", "laplacian", "gaussian"])
+def test_convolve(name: str) -> None:
+    """The filtered amplitudes are the correlation of the encoded ones."""
+    kernel = KERNELS[name]
+    image = np.random.default_rng(0).integers(0, 256, (4, 4)).astype(float)
+    quantumimage = QuantumImage(image)
+    FRQI(quantumimage, method="ucry")
+    convolve(quantumimage, kernel)
+
+    n_aux_qubit = quantumimage.n_aux_qubit
+    state = Statevector(quantumimage.circuit).data.reshape(-1, pow(2, n_aux_qubit))
+    encoded = QuantumImage(image).statevector("FRQI").reshape(2, 4, 4)
+    expected = correlate(encoded, kernel) / np.abs(kernel).sum()
+    assert np.allclose(state[:, 0].reshape(2, 4, 4), expected)
+
+
+def test_emulate_kernel() -> None:
+    """The emulation of a compiled program on a larger image."""
+    kernel = np.array([[0, 0, 0], [0, 2, -1], [0, 0, 3]])
+    image = np.random.default_rng(1).integers(0, 256, (16, 16)).astype(float)
+    n_aux_qubit, program = compile_kernel(kernel)
+    emulator = Emulator(QuantumImage(image), n_aux_qubit, "FRQI", "increment")
+    emulator.run(program)
+
+    filtered = emulator.statevector().reshape(-1, pow(2, n_aux_qubit))[:, 0]
+    encoded = QuantumImage(image).statevector("FRQI").reshape(2, 16, 16)
+    assert np.allclose(filtered.reshape(2, 16, 16), correlate(encoded, kernel) / 6)
+
+
+def test_shared_translations() -> None:
+    """One translation per distinct non zero offset, none for the zero taps."""
+    n_aux_qubit, program = compile_kernel(KERNELS["sobel_x"])
+    translations = [op for op in program if op[0] == "ctranslate"]
+    assert n_aux_qubit == 3
+    assert sorted((op[1], op[2]) for op in translations) == [
+        ("x", -1),
+        ("x", 1),
+        ("y", -1),
+        ("y", 1),
+    ]
+
+    n_aux_qubit, program = compile_kernel(np.array([[0, 0, 0], [0, 0, 5], [0, 0, 0]]))
+    assert n_aux_qubit == 0
+    assert program == [("ctranslate", "x", -1, ())]
+
+
+@pytest.mark.parametrize("row, col, weight", [(1, 1, -2.0), (1, 2, -5.0)])
+def test_single_negative_tap(row: int, col: int, weight: float) -> None:
+    """A single negative tap needs no register, its sign is left out as a global phase."""
+    kernel = np.zeros((3, 3))
+    kernel[row, col] = weight
+    image = np.random.default_rng(2).integers(0, 256, (4, 4)).astype(float)
+    quantumimage = QuantumImage(image)
+    FRQI(quantumimage, method="ucry")
+    convolve(quantumimage, kernel)
+
+    assert quantumimage.n_aux_qubit == 0
+    state = Statevector(quantumimage.circuit).data.reshape(2, 4, 4)
+    encoded = QuantumImage(image).statevector("FRQI").reshape(2, 4, 4)
+    assert np.allclose(state, -correlate(encoded, kernel) / abs(weight))
+
+
+def test_compile_kernel_failure() -> None:
+    """Kernels with no taps or the wrong shape are rejected."""
+    with pytest.raises(Exception) as excinfo:
+        compile_kernel(np.zeros((3, 3)))
+    assert str(excinfo.value) == "The kernel has no non zero tap"
+
+    with pytest.raises(Exception) as excinfo:
+        compile_kernel(np.ones(3))
+    assert str(excinfo.value) == "The kernel must be two dimensional, got 1"
@@ -0,0 +1,63 @@
+"""Tests for the `Operations` module."""
+from qiskit import QuantumCircuit
+from qiskit.quantum_info import Operator
+
+from qimp.ImageEncoding.Operations import OpList
+
+
+def test_cancellation() -> None:
+    """Adjacent self-inverse gates cancel, gates in between prevent it."""
+    ops = OpList(3)
+    ops.x([0, 1])
+    ops.x(0)
+    ops.cx(1, 2)
+    ops.h(2)
+    ops.h(2)
+    ops.cx(1, 2)
+    assert len(ops) == 1
+
+    ops.x(2)
+    ops.cx(1, 2)
+    ops.x(2)
+
+    assert len(ops) == 4
+    circuit = ops.materialise(QuantumCircuit(3))
+    assert [instruction.operation.name for instruction in circuit.data] == ["x", "x", "cx", "x"]
+
+
+def test_barriers() -> None:
+    """Barriers block cancellation and repeated barriers are dropped."""
+    ops = OpList(2)
+    ops.x(0)
+    ops.barrier()
+    ops.barrier()
+    ops.x(0)
+    ops.barrier()
+    ops.x(1)
+    ops.x(1)
+    ops.barrier()
+
+    circuit = ops.materialise(QuantumCircuit(2))
+
+    assert dict(circuit.count_ops()) == {"x": 2, "barrier": 2}
+    assert ops.size() == circuit.size() == 2
+
+
+def test_extend() -> None:
+    """Gates cancel across the boundary of two lists and the operator is unchanged."""
+    first, second = OpList(3), OpList(3)
+    first.h(0)
+    first.mcx([0, 1], 2)
+    first.x([0, 2])
+    second.x([0, 1])
+    second.ry(0.5, 2)
+    reference = QuantumCircuit(3)
+    first.materialise(reference)
+    second.materialise(reference)
+
+    first.extend(second)
+
+    assert len(first) == 5
+    circuit = first.materialise(QuantumCircuit(3))
+    assert dict(circuit.count_ops())["x"] == 2
+    assert Operator(circuit).equiv(Operator(reference))
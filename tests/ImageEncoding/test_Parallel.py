@@ -0,0 +1,63 @@
+"""Tests for the `Parallel` module."""
+import typing
+
+import numpy as np
+import pytest
+from qiskit.quantum_info import Statevector
+
+from qimp.ImageEncoding.Encodings import FRQI, NEQR
+from qimp.ImageEncoding.Parallel import encode_images, encode_rows
+from qimp.ImageEncoding.QuantumImage import QuantumImage
+
+
+def test_encode_images() -> None:
+    """The images are encoded in parallel as they would be sequentially."""
+    rng = np.random.default_rng(0)
+    images = [rng.integers(0, 256, (4, 4)).astype(float) for _ in range(3)]
+
+    quantumimages = encode_images(images, "NEQR", workers=2)
+
+    assert [quantumimage.encoding for quantumimage in quantumimages] == ["NEQR"] * 3
+    for image, quantumimage in zip(images, quantumimages):
+        assert np.array_equal(quantumimage.image, image)
+        assert np.allclose(Statevector(quantumimage.circuit).data, quantumimage.statevector())
+
+
+def test_encode_images_sobel() -> None:
+    """The filter is applied in the workers."""
+    quantumimage = encode_images([np.zeros((4, 4))], "FRQI", "ucry", sobel=True, workers=1)[0]
+
+    assert quantumimage.n_aux_qubit == 4
+    assert quantumimage.circuit.num_qubits == 5 + 4 + 2 + 3
+
+
+@pytest.mark.parametrize("encoding, encoder", [("FRQI", FRQI), ("NEQR", NEQR)])
+def test_encode_rows(encoding: str, encoder: typing.Any) -> None:
+    """Merging the row ranges gives the circuit of the sequential encoder."""
+    image = np.random.default_rng(1).integers(0, 256, (4, 4)).astype(float)
+    sequential = QuantumImage(image)
+    encoder(sequential)
+    parallel = QuantumImage(image)
+
+    encode_rows(parallel, encoding, chunks=3, workers=2)
+
+    assert parallel.encoding == encoding
+    assert Statevector(parallel.circuit).equiv(Statevector(sequential.circuit))
+    assert parallel.circuit.count_ops() == sequential.circuit.count_ops()
+
+
+def test_encode_rows_failure() -> None:
+    """Unknown encodings and encoded images are rejected."""
+    quantumimage = QuantumImage(np.zeros((4, 4)))
+    with pytest.raises(Exception) as excinfo:
+        encode_rows(quantumimage, "OQIM")
+    assert str(excinfo.value) == "Unknown encoding OQIM"
+
+    FRQI(quantumimage, method="ucry")
+    with pytest.raises(Exception) as excinfo:
+        encode_rows(quantumimage)
+    assert str(excinfo.value) == "The image has allready been encoded"
+
+    with pytest.raises(Exception) as excinfo:
+        encode_images([np.zeros((4, 4))], "OQIM")
+    assert str(excinfo.value) == "Unknown encoding OQIM"
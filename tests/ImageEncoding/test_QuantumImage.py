@@ -1,13 +1,15 @@
 """Tests for `qimp` module."""
-from typing import Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
 from unittest.mock import patch
 
 import numpy as np
 import pytest
 from qiskit import transpile
+from qiskit.quantum_info import Statevector
 from qiskit_aer import AerSimulator
 
-from qimp.ImageEncoding.Encodings import FRQI
+from qimp.ImageEncoding.Encodings import FRQI, NEQR
 from qimp.ImageEncoding.QuantumImage import QuantumImage, generate_example_image
 
 
@@ -166,3 +168,110 @@ def test_measure() -> None:
     image.measure()
 
     assert len(image.circuit.clbits) == side + 1
+
+
+@pytest.mark.parametrize("encoding", [FRQI, NEQR])
+def test_statevector(encoding: Callable[[QuantumImage], None]) -> None:
+    """The analytic statevector matches the one of the encoding circuit."""
+    image = np.random.default_rng(3).integers(0, 256, (4, 4))
+    quantumimage = QuantumImage(image)
+    expected = quantumimage.statevector(encoding.__name__)
+
+    encoding(quantumimage)
+
+    assert np.allclose(Statevector(quantumimage.circuit).data, expected)
+    assert np.allclose(quantumimage.statevector(), expected)
+
+
+def test_statevector_failure() -> None:
+    """An image without an encoding has no statevector."""
+    with pytest.raises(Exception) as excinfo:
+        QuantumImage(generate_example_image(4)).statevector()
+    assert str(excinfo.value) == "Unknown encoding "
+
+
+@pytest.mark.parametrize("encoding", [FRQI, NEQR])
+def test_retrieve(encoding: Callable[[QuantumImage], None]) -> None:
+    """The image is rebuilt exactly from noise-free counts."""
+    image = np.random.default_rng(5).integers(0, 256, (4, 4))
+    quantumimage = QuantumImage(image)
+    encoding(quantumimage)
+    probabilities = np.abs(quantumimage.statevector()) ** 2
+    width = quantumimage.total_qubits
+    counts = {
+        format(index, "0" + str(width) + "b"): int(round(value * 10**9))
+        for index, value in enumerate(probabilities)
+        if value > 0
+    }
+
+    retrieved = quantumimage.retrieve(counts)
+
+    assert retrieved.shape == (4, 4)
+    assert np.allclose(retrieved, image, atol=1e-2)
+
+
+def test_retrieve_measured() -> None:
+    """The image retrieved from a simulation is close to the encoded one."""
+    image = QuantumImage(generate_example_image(side=4))
+    FRQI(image)
+    image.measure()
+    simulator = AerSimulator()
+    result = simulator.run(transpile(image.circuit, simulator), shots=20000, seed_simulator=1)
+
+    retrieved = image.retrieve(result.result())
+
+    assert np.allclose(retrieved, image.image, atol=10)
+
+
+@pytest.mark.parametrize("encoding", [FRQI, NEQR])
+def test_retrieve_exact(encoding: Callable[[QuantumImage], None]) -> None:
+    """The saved probabilities give back the image from a single noise-free simulation."""
+    image = np.random.default_rng(11).integers(0, 256, (4, 4))
+    quantumimage = QuantumImage(image)
+    encoding(quantumimage)
+    quantumimage.save_probabilities()
+    simulator = AerSimulator(method="statevector")
+
+    result = simulator.run(transpile(quantumimage.circuit, simulator), shots=1).result()
+
+    assert np.allclose(quantumimage.retrieve(result), image)
+
+
+def test_retrieve_statevector() -> None:
+    """The probabilities are marginalised from a saved statevector."""
+    image = np.random.default_rng(13).integers(0, 256, (4, 4))
+    quantumimage = QuantumImage(image)
+    FRQI(quantumimage)
+    quantumimage.add_qubits(2, "extra")
+    quantumimage.circuit.save_statevector()
+    simulator = AerSimulator(method="statevector")
+
+    result = simulator.run(transpile(quantumimage.circuit, simulator), shots=1).result()
+
+    assert np.allclose(quantumimage.retrieve(result), image)
+
+
+def test_instance_state() -> None:
+    """Images own their state and create their circuit on first use."""
+    first = QuantumImage(generate_example_image(4))
+    second = QuantumImage(generate_example_image(4))
+
+    assert not hasattr(first, "__dict__")
+    assert first._circuit is None
+    assert first.circuit is first.circuit
+    assert first.circuit is not second.circuit
+    FRQI(first)
+    assert second.x_wires == []
+    assert second.encoding == ""
+
+
+def test_thread_pool() -> None:
+    """Images are encoded concurrently from threads."""
+    rng = np.random.default_rng(17)
+    quantumimages = [QuantumImage(rng.integers(0, 256, (4, 4))) for _ in range(8)]
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        list(executor.map(lambda quantumimage: NEQR(quantumimage), quantumimages))
+
+    for quantumimage in quantumimages:
+        assert np.allclose(Statevector(quantumimage.circuit).data, quantumimage.statevector())
@@ -0,0 +1,65 @@
+"""Tests for the `Templates` module."""
+import numpy as np
+import pytest
+from qiskit.quantum_info import Statevector
+from qiskit_aer import AerSimulator
+
+from qimp.Execution.Cache import transpile_cache
+from qimp.ImageEncoding.QuantumImage import QuantumImage, generate_example_image
+from qimp.ImageEncoding.Templates import FRQITemplate, frqi_template
+
+
+@pytest.mark.parametrize("method", ["ucry", "mcry"])
+def test_bind(method: str) -> None:
+    """Binding the angles of an image prepares its FRQI state."""
+    template = FRQITemplate(4, method=method)
+    for seed in range(2):
+        image = QuantumImage(np.random.default_rng(seed).integers(0, 256, (4, 4)))
+
+        template.bind(image)
+
+        assert image.encoding == "FRQI"
+        assert image.total_qubits == 5
+        assert np.allclose(Statevector(image.circuit).data, image.statevector())
+
+
+def test_bind_transpiled() -> None:
+    """The template is transpiled once and reused for every image."""
+    template = frqi_template(4)
+    simulator = AerSimulator()
+    transpile_cache.clear()
+    circuits = []
+    for seed in range(2):
+        image = QuantumImage(np.random.default_rng(seed).integers(0, 256, (4, 4)))
+        circuits.append(template.bind(image, simulator, optimization_level=1))
+        assert np.allclose(Statevector(image.circuit).data, image.statevector())
+
+    assert frqi_template(4) is template
+    assert (transpile_cache.hits, transpile_cache.misses) == (1, 1)
+    assert circuits[0].num_parameters == 0
+
+
+def test_bind_backends() -> None:
+    """The template is transpiled for every Aer method, not once per backend name."""
+    template = FRQITemplate(4, method="mcry")
+    statevector = template.transpile(AerSimulator(method="statevector"))
+    stabilizer = template.transpile(AerSimulator(method="extended_stabilizer"))
+
+    assert statevector != stabilizer
+    assert "mcx" in statevector.count_ops()
+    assert "mcx" not in stabilizer.count_ops()
+
+
+def test_bind_failure() -> None:
+    """Images of another size or already encoded are rejected."""
+    template = frqi_template(4)
+    image = QuantumImage(generate_example_image(4))
+    template.bind(image)
+
+    with pytest.raises(Exception) as excinfo:
+        template.bind(image)
+    assert str(excinfo.value) == "The image has allready been encoded"
+
+    with pytest.raises(Exception) as excinfo:
+        template.bind(QuantumImage(generate_example_image(8)))
+    assert str(excinfo.value) == "The template encodes images with 4 address qubits, got 6"
@@ -1,7 +1,19 @@
+from typing import Callable
+
+import numpy as np
 import pytest
 import qiskit
-
-from qimp.ImageEncoding.Encodings import FRQI, NEQR, hadamard
+from qiskit.quantum_info import Statevector
+
+from qimp.ImageEncoding.Encodings import (
+    FRQI,
+    NEQR,
+    binarization,
+    hadamard,
+    merge_cubes,
+    pixel_order,
+    walsh_hadamard,
+)
 from qimp.ImageEncoding.QuantumImage import QuantumImage, generate_example_image
 
 """Tests for `qimp` module."""
@@ -126,3 +138,147 @@ def test_NEQR_encoding_failure() -> None:
         NEQR(quantumimage)
         NEQR(quantumimage)
     assert str(excinfo.value) == "The image has allready been encoded"
+
+
+def test_gray_code() -> None:
+    """Consecutive Gray code words differ in exactly one bit."""
+    order = pixel_order(4, "gray")
+
+    assert sorted(order) == list(range(16))
+    for previous, current in zip(order, order[1:]):
+        assert bin(previous ^ current).count("1") == 1
+
+
+def test_pixel_order_failure() -> None:
+    """An unknown traversal raises an exception."""
+    with pytest.raises(Exception) as excinfo:
+        pixel_order(4, "spiral")
+    assert str(excinfo.value) == "Unknown traversal spiral"
+
+
+@pytest.mark.parametrize("encoding", [FRQI, NEQR])
+def test_gray_traversal(encoding: Callable[..., None]) -> None:
+    """
+    Test case for the Gray-code traversal.
+
+    The Gray-code walk must prepare the same state as the row-major walk while using
+    fewer X gates on the address register.
+    """
+    row_image = QuantumImage(generate_example_image(4))
+    gray_image = QuantumImage(generate_example_image(4))
+
+    encoding(row_image)
+    encoding(gray_image, traversal="gray")
+
+    row_state = Statevector(row_image.circuit)
+    gray_state = Statevector(gray_image.circuit)
+
+    assert row_state.equiv(gray_state)
+    assert gray_image.circuit.count_ops()["x"] < row_image.circuit.count_ops()["x"]
+
+
+def test_walsh_hadamard() -> None:
+    """The fast transform matches the Hadamard matrix product."""
+    values = np.arange(8, dtype=float)
+    matrix = np.array([[(-1) ** bin(i & j).count("1") for j in range(8)] for i in range(8)])
+
+    assert np.allclose(walsh_hadamard(values), matrix @ values)
+
+
+def test_FRQI_ucry() -> None:
+    """
+    Test case for the uniformly controlled FRQI backend.
+
+    The single uniformly controlled rotation must prepare the same state as the per-pixel
+    rotations, using exactly one CNOT per pixel.
+    """
+    image = np.random.default_rng(7).integers(0, 256, (8, 8)).astype(float)
+    mcry_image = QuantumImage(image)
+    ucry_image = QuantumImage(image)
+
+    FRQI(mcry_image)
+    FRQI(ucry_image, method="ucry")
+
+    assert Statevector(mcry_image.circuit).equiv(Statevector(ucry_image.circuit))
+    assert ucry_image.circuit.count_ops()["cx"] == 64
+
+
+def test_FRQI_method_failure() -> None:
+    """An unknown FRQI method raises an exception."""
+    with pytest.raises(Exception) as excinfo:
+        FRQI(QuantumImage(generate_example_image(4)), method="qrom")
+    assert str(excinfo.value) == "Unknown FRQI method qrom"
+
+
+@pytest.mark.parametrize("encoding", [FRQI, NEQR])
+def test_sparse_encoding(encoding: Callable[..., None]) -> None:
+    """
+    Test case for the sparse encoding.
+
+    Skipping the black pixels must not change the encoded state, while the circuit only
+    keeps the gates of the bright pixels.
+    """
+    dense_image = QuantumImage(generate_example_image(4))
+    sparse_image = QuantumImage(generate_example_image(4))
+
+    encoding(dense_image)
+    encoding(sparse_image, sparse=True)
+
+    assert Statevector(dense_image.circuit).equiv(Statevector(sparse_image.circuit))
+    assert sparse_image.circuit.size() < dense_image.circuit.size()
+    assert "barrier" not in sparse_image.circuit.count_ops()
+
+
+def test_sparse_threshold() -> None:
+    """Pixels below the threshold are encoded as black."""
+    image = generate_example_image(4)
+    image[1][1] = 10
+    thresholded_image = QuantumImage(image)
+    black_image = QuantumImage(np.where(image > 10, image, 0))
+
+    FRQI(thresholded_image, sparse=True, threshold=10)
+    FRQI(black_image)
+
+    assert Statevector(thresholded_image.circuit).equiv(Statevector(black_image.circuit))
+
+
+def test_binarization() -> None:
+    """The bit planes hold the binary value of every pixel, most significant bit first."""
+    image = np.array([[0, 1], [128, 255]])
+
+    bitplanes = binarization(image)
+
+    assert bitplanes.shape == (2, 2, 8)
+    assert bitplanes.dtype == np.uint8
+    assert bitplanes[0][1].tolist() == [0, 0, 0, 0, 0, 0, 0, 1]
+    assert bitplanes[1][0].tolist() == [1, 0, 0, 0, 0, 0, 0, 0]
+    assert bitplanes[1][1].sum() == 8
+
+
+def test_merge_cubes() -> None:
+    """An aligned block of positions collapses into a single cube."""
+    block = [0b0101, 0b0111, 0b1101, 0b1111]
+
+    assert merge_cubes(block, 4) == [(0b0101, 0b0101)]
+    assert merge_cubes([], 4) == []
+
+
+def test_NEQR_esop() -> None:
+    """
+    Test case for the minimised NEQR synthesis.
+
+    The cube based circuit must prepare the same state as the per-pixel one with far fewer
+    multi-controlled gates.
+    """
+    image = generate_example_image(8)
+    image[0][0] = 7
+    mcx_image = QuantumImage(image)
+    esop_image = QuantumImage(image)
+
+    NEQR(mcx_image)
+    NEQR(esop_image, method="esop")
+
+    assert Statevector(mcx_image.circuit).equiv(Statevector(esop_image.circuit))
+    esop_gates = [g for g in esop_image.circuit.data if g.operation.name.startswith("mcx")]
+    mcx_gates = [g for g in mcx_image.circuit.data if g.operation.name.startswith("mcx")]
+    assert len(esop_gates) < len(mcx_gates) / 3
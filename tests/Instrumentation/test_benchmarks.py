@@ -0,0 +1,31 @@
+"""Tests for the `Benchmarks` module."""
+from typing import Any
+
+from qimp.Instrumentation import Benchmarks
+
+
+def test_run_benchmarks(tmp_path: Any) -> None:
+    """A small run records every metric and round-trips through JSON."""
+    results = Benchmarks.run_benchmarks(sizes=[4, 8], cases=["FRQI-ucry"], max_side=4)
+
+    assert list(results["results"]) == ["FRQI-ucry/4"]
+    record = results["results"]["FRQI-ucry/4"]
+    assert record["qubits"] == 5
+    assert record["gates"] > 0
+    assert record["simulation_time"] >= 0
+    path = str(tmp_path / "results.json")
+    Benchmarks.save(results, path)
+    assert Benchmarks.load(path) == results
+
+
+def test_compare() -> None:
+    """Timings regress past the tolerance, counts regress as soon as they grow."""
+    baseline = {"results": {"sobel/4": {"build_time": 1.0, "gates": 100, "depth": None}}}
+    faster = {"results": {"sobel/4": {"build_time": 1.2, "gates": 100, "depth": 10}}}
+    slower = {"results": {"sobel/4": {"build_time": 2.0, "gates": 101}, "sobel/8": {}}}
+
+    assert Benchmarks.compare(faster, baseline) == []
+    assert Benchmarks.compare(slower, baseline) == [
+        "sobel/4 build_time: 1.0 -> 2.0",
+        "sobel/4 gates: 100 -> 101",
+    ]
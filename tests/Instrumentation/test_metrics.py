@@ -0,0 +1,73 @@
+"""Tests for the `Metrics` module."""
+import json
+from typing import Any
+
+import numpy as np
+
+from qimp.Filters.Filters import sobel
+from qimp.ImageEncoding.Encodings import FRQI
+from qimp.ImageEncoding.QuantumImage import QuantumImage, generate_example_image
+from qimp.Instrumentation.Metrics import Metrics, stage
+
+
+def test_pipeline_metrics() -> None:
+    """Every stage of the encoding is recorded with the size of the circuit."""
+    metrics = Metrics(track_memory=True)
+    image = QuantumImage(generate_example_image(4), zooming_factor=0.5, metrics=metrics)
+
+    FRQI(image)
+    image.retrieve(np.abs(image.statevector()) ** 2)
+
+    names = [record["name"] for record in metrics.stages]
+    assert names == ["zoom", "pad", "angles", "encoding", "retrieve"]
+    encoding = metrics.stages[3]
+    assert encoding["gates"] == image.circuit.size()
+    assert encoding["depth"] == image.circuit.depth()
+    assert encoding["qubits"] == 3
+    assert all(record["peak_memory"] >= 0 for record in metrics.stages)
+
+
+def test_sobel_metrics() -> None:
+    """The translations of sobel, built in a gate list, describe the growing circuit."""
+    metrics = Metrics()
+    image = QuantumImage(np.zeros((2, 2)), metrics=metrics)
+    FRQI(image)
+    sobel(image, method="increment")
+
+    encoding = [record for record in metrics.stages if record["name"] == "encoding"][0]
+    translations = [record for record in metrics.stages if record["name"] == "translation_y"]
+    gates = [record["gates"] for record in translations]
+    assert translations
+    assert encoding["gates"] < gates[0]
+    assert gates == sorted(gates)
+    assert gates[-1] <= image.circuit.size()
+    assert translations[-1]["qubits"] == image.circuit.num_qubits
+    assert "depth" not in translations[-1]
+
+
+def test_metrics_export(tmp_path: Any) -> None:
+    """The records are exported as a dict and as JSON."""
+    metrics = Metrics(track_depth=False)
+    with metrics.stage("transpile") as record:
+        record["backend"] = "aer_simulator"
+
+    path = str(tmp_path / "metrics.json")
+    document = json.loads(metrics.to_json(path))
+
+    assert document == metrics.to_dict()
+    assert document["stages"][0]["backend"] == "aer_simulator"
+    assert document["total_wall_time"] == document["stages"][0]["wall_time"]
+    with open(path) as file:
+        assert json.load(file) == document
+
+
+def test_no_metrics(capsys: Any) -> None:
+    """Without metrics nothing is recorded nor printed."""
+    with stage(None, "encoding") as record:
+        image = QuantumImage(generate_example_image(4))
+        FRQI(image)
+
+    captured = capsys.readouterr()
+    assert record is None
+    assert captured.out == ""
+    assert captured.err == ""
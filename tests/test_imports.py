@@ -0,0 +1,50 @@
+"""Import checks for `qimp`."""
+import os
+import subprocess
+import sys
+
+import pytest
+
+# scipy itself is loaded by qiskit, only the image module is deferred
+LAZY_MODULES = ["matplotlib", "scipy.ndimage", "tqdm", "qiskit_aer"]
+
+
+def import_in_subprocess(module: str) -> subprocess.CompletedProcess:
+    """Import a module in a fresh interpreter and list the deferred modules it loaded."""
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+    code = (
+        "import sys\n"
+        "import " + module + "\n"
+        "print(','.join(m for m in " + repr(LAZY_MODULES) + " if m in sys.modules))\n"
+    )
+    return subprocess.run(
+        [sys.executable, "-c", code],
+        capture_output=True,
+        text=True,
+        env=env,
+        check=True,
+    )
+
+
+@pytest.mark.parametrize(
+    "module",
+    ["qimp", "qimp.ImageEncoding.Encodings", "qimp.Filters.Filters", "qimp.Filters.Gates"],
+)
+def test_lazy_imports(module: str) -> None:
+    """Importing the package must not load the plotting, zooming or simulation libraries."""
+    completed = import_in_subprocess(module)
+
+    loaded = completed.stdout.strip().split(",") if completed.stdout.strip() else []
+    assert "qiskit_aer" not in loaded
+    assert "matplotlib" not in loaded
+    assert loaded == []
+
+
+def test_lazy_gates() -> None:
+    """The adder gates are only built when first requested."""
+    from qimp.Filters import Gates
+
+    assert Gates.carry_gate == Gates.make_carry_gate()
+    assert Gates.summing_gate is Gates.get_summing_gate()
+    with pytest.raises(AttributeError):
+        Gates.not_a_gate